@@ -1,31 +1,62 @@
 from flask import Flask
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from marshmallow import ValidationError
 from werkzeug.exceptions import HTTPException
 import logging
-import os
+
+from .cache import make_listing_cache
+from .config import Config
+from .json_provider import FastJSONProvider
+from .passwords import HashingPool
+from .pool import engine_options, pool_metrics
+from .profiling import init_profiling
+from .query_audit import init_query_audit
+from .sqlite_profile import apply_sqlite_profile
+from .streams import make_task_stream
+from .tokens import init_tokens
+from .utils.policy import init_policy
 
 
 db = SQLAlchemy()  # gloabl sql-alchemy instance
 
 
-def create_app():
+def create_app(config=Config):
+    """Build the app from a config object (class or dict), defaulting to Config."""
     app = Flask(__name__)
 
-    base_dir = os.path.abspath(os.path.dirname(__file__))
-    db_path = os.path.join(base_dir, "..", "instance", "tasks.db")
-    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    if isinstance(config, dict):
+        app.config.from_object(Config)
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
 
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-    app.config["JWT_SECRET_KEY"] = (
-        "super-secret-key"  # i will change this in production
-    )
+    app.json = FastJSONProvider(app, encoder=app.config["JSON_ENCODER"])
 
     db.init_app(
         app
     )  # bind the app to sqlalchemy(so it knows the config and app content)
-    JWTManager(app)
+    init_profiling(app)  # first, so its timer wraps the other request hooks
+    init_query_audit(app)
+    init_tokens(app)  # JWTManager plus claims cache and token revocation
+    init_policy(app)
+
+    listing_cache = make_listing_cache(app.config)
+    if listing_cache is not None:
+        app.extensions["listing_cache"] = listing_cache
+
+    task_stream = make_task_stream(app.config)
+    if task_stream is not None:
+        app.extensions["task_stream"] = task_stream
+
+    if app.config["PASSWORD_HASH_WORKERS"] > 0:
+        app.extensions["password_pool"] = HashingPool(
+            app.config["PASSWORD_HASH_WORKERS"], app.config["PASSWORD_HASH_QUEUE_LIMIT"]
+        )
+
+    if app.config["SQLITE_PERFORMANCE_PROFILE"]:
+        with app.app_context():
+            apply_sqlite_profile(db.engine, app.config)
 
     from .routes import bp as tasks_bp
     from .auth_routes import bp as auth_bp
@@ -34,6 +65,23 @@ def create_app():
     app.register_blueprint(tasks_bp)
     app.register_blueprint(auth_bp)
 
+    from .summaries import repair_summaries_command
+    from .webhooks import dispatch_webhooks_command
+    from .sync import prune_tombstones_command
+
+    app.cli.add_command(repair_summaries_command)
+    app.cli.add_command(prune_tombstones_command)
+    app.cli.add_command(dispatch_webhooks_command)
+
+    # connection-pool metrics hook
+    metrics_hook = app.config.get("DB_POOL_METRICS_HOOK")
+    if metrics_hook:
+
+        @app.after_request
+        def report_pool_metrics(response):
+            metrics_hook(pool_metrics(db.engine))
+            return response
+
     # logging basic info
     logging.basicConfig(
         level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
@@ -1,7 +1,14 @@
-from flask import Blueprint, request, jsonify, abort
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from .models import db, User
+from flask import Blueprint, request, jsonify, abort, current_app
+from flask_jwt_extended import (
+    create_access_token,
+    jwt_required,
+    get_jwt,
+    get_jwt_identity,
+)
+from .models import db, User, TaskSummary
 from .schemas import UserSchema
+from .passwords import hash_password, run_hashing, verify_and_rehash
+from .tokens import revoke_token
 
 bp = Blueprint("auth", __name__)
 user_schema = UserSchema()
@@ -20,12 +27,15 @@ def register():
     if existing_user:
         abort(400, description=f"Username '{username}' is already taken.")
 
+    # hash off the request thread when pooled, like /login
+    method = current_app.config["PASSWORD_HASH_METHOD"]
     user = User(username=username)
-    user.set_password(password)
+    user.password_hash = run_hashing(hash_password, password, method)
+    user.task_summary = TaskSummary(total=0, completed=0)
     db.session.add(user)
     db.session.commit()
 
-    access_token = create_access_token(identity=str(user.id))
+    access_token = _access_token(user)
     return jsonify(access_token=access_token, user=user_schema.dump(user)), 201
 
 
@@ -39,18 +49,44 @@ def login():
         db.select(User).filter_by(username=username)
     ).scalar_one_or_none()
 
-    if not user or not user.check_password(password):
+    if not user:
         abort(401, description="invalid credentials")
 
-    access_token = create_access_token(
-        identity=str(user.id), additional_claims={"role": user.role}
+    # verify (and upgrade outdated hashes) off the request thread when pooled
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    valid, new_hash = run_hashing(
+        verify_and_rehash, user.password_hash, password, method
     )
+    if not valid:
+        abort(401, description="invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        db.session.commit()
+
+    access_token = _access_token(user)
     return jsonify(access_token=access_token, user=user_schema.dump(user))
 
 
+@bp.post("/logout")
+@jwt_required()
+def logout():
+    revoke_token(get_jwt())
+    return jsonify(msg="Logged out")
+
+
 @bp.get("/me")
 @jwt_required()
 def me():
-    user_id = get_jwt_identity()
-    user = db.session.get(User, user_id)
+    # one primary-key read: the token's username and role claims are as
+    # old as the token, and the user may since be renamed, demoted or gone
+    user = db.session.get(User, int(get_jwt_identity()))
+    if user is None:
+        abort(404, description="User not found")
     return jsonify(user_schema.dump(user))
+
+
+def _access_token(user):
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={"role": user.role, "username": user.username},
+    )
@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+STALE_USERS_KEY = "stale_listing_users"
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class InProcessCache:
+    """
+    LRU cache of listing responses held in this process.
+
+    Generations live next to the entries, so this is only coherent with a
+    single worker process; use SharedCache when running several.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id) -> int:
+        return self._generations.get(user_id, 0)
+
+    def bump(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def metrics(self) -> dict:
+        return dict(self.stats.as_dict(), backend="memory", size=len(self._entries))
+
+
+class SharedCache:
+    """
+    Listing cache on a shared key/value store.
+
+    `client` needs redis-style get(key), set(key, value, ex=ttl) and
+    incr(key); size bounds and LRU eviction are left to the store (e.g. a
+    Redis maxmemory-policy of allkeys-lru).
+    """
+
+    def __init__(self, client, prefix="tasks:listing:", ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def generation(self, user_id) -> int:
+        return int(self.client.get(f"{self.prefix}gen:{user_id}") or 0)
+
+    def bump(self, user_id):
+        self.client.incr(f"{self.prefix}gen:{user_id}")
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + repr(key))
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode(), body
+
+    def set(self, key, entry):
+        etag, body = entry
+        value = etag.encode() + b"\n" + body
+        self.client.set(self.prefix + repr(key), value, ex=self.ttl)
+
+    def metrics(self) -> dict:
+        return dict(self.stats.as_dict(), backend="shared")
+
+
+def make_listing_cache(config):
+    backend = config["LISTING_CACHE"]
+    if backend == "memory":
+        return InProcessCache(config["LISTING_CACHE_MAX_ENTRIES"])
+    if backend == "shared":
+        client = config["LISTING_CACHE_CLIENT"]
+        if client is None:
+            raise RuntimeError("LISTING_CACHE='shared' needs a LISTING_CACHE_CLIENT")
+        return SharedCache(client, ttl=config["LISTING_CACHE_TTL"])
+    if backend in (None, "", "none"):
+        return None
+    raise ValueError("LISTING_CACHE must be 'none', 'memory' or 'shared'")
+
+
+def listing_cache():
+    return current_app.extensions.get("listing_cache")
+
+
+def listing_key(cache, user_id, filters) -> tuple:
+    """Cache key: user, their current generation, and every listing parameter."""
+    user_id = int(user_id)
+    return (user_id, cache.generation(user_id), tuple(sorted(filters.items())))
+
+
+def mark_listings_stale(session, user_id):
+    """Have the user's cached listings dropped once this transaction commits."""
+    session.info.setdefault(STALE_USERS_KEY, set()).add(int(user_id))
+
+
+# bump generations only after commit, so a reader can never cache
+# pre-commit data under the new generation
+@event.listens_for(Session, "after_commit")
+def _bump_generations(session):
+    users = session.info.pop(STALE_USERS_KEY, None)
+    if not users or not has_app_context():
+        return
+    cache = listing_cache()
+    if cache is not None:
+        for user_id in users:
+            cache.bump(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_users(session):
+    session.info.pop(STALE_USERS_KEY, None)
@@ -0,0 +1,154 @@
+import os
+
+base_dir = os.path.abspath(os.path.dirname(__file__))
+default_db_path = os.path.join(base_dir, "..", "instance", "tasks.db")
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _env_lines(name):
+    # a file with one entry per line, for lists too long for the env itself
+    path = os.environ.get(name)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class Config:
+    """Default settings; every database knob can be overridden from the env."""
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "DATABASE_URL", f"sqlite:///{default_db_path}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = os.environ.get(
+        "JWT_SECRET_KEY", "super-secret-key"
+    )  # i will change this in production
+
+    # connection pool (ignored for in-memory SQLite, which uses one connection)
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)  # seconds to wait for a slot
+    DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", -1)  # seconds, -1 = never
+    DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+    DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", None)  # PostgreSQL
+    DB_POOL_METRICS = _env_bool("DB_POOL_METRICS", True)
+    DB_POOL_METRICS_HOOK = None  # callable(snapshot) run after every request
+
+    # opt-in SQLite tuning: WAL so readers don't block behind writers, and a
+    # busy timeout so concurrent writers queue instead of "database is locked"
+    SQLITE_PERFORMANCE_PROFILE = _env_bool("SQLITE_PERFORMANCE_PROFILE", False)
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+    SQLITE_MMAP_SIZE = _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)  # bytes
+    SQLITE_CACHE_SIZE = _env_int("SQLITE_CACHE_SIZE", -64000)  # negative = KiB
+
+    # werkzeug hash method and cost, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+    # hashes made with other parameters are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    # >0 hashes (register) and verifies (login) on a bounded pool; past
+    # workers + queue limit, or after the timeout -> 503 with Retry-After
+    PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", 0)
+    PASSWORD_HASH_QUEUE_LIMIT = _env_int("PASSWORD_HASH_QUEUE_LIMIT", 16)
+    PASSWORD_HASH_TIMEOUT = _env_int("PASSWORD_HASH_TIMEOUT", 10)  # seconds
+
+    # GET /tasks response cache: "none", "memory" (single process only) or
+    # "shared" with LISTING_CACHE_CLIENT set to a redis-style client
+    LISTING_CACHE = os.environ.get("LISTING_CACHE", "none")
+    LISTING_CACHE_MAX_ENTRIES = _env_int("LISTING_CACHE_MAX_ENTRIES", 1024)
+    LISTING_CACHE_TTL = _env_int("LISTING_CACHE_TTL", 300)  # seconds, shared only
+    LISTING_CACHE_CLIENT = None
+
+    # verified-token claims kept for up to JWT_CLAIMS_CACHE_TTL seconds (never
+    # past the token's exp) so repeat requests skip signature checks; 0 = off
+    JWT_CLAIMS_CACHE_SIZE = _env_int("JWT_CLAIMS_CACHE_SIZE", 1024)
+    JWT_CLAIMS_CACHE_TTL = _env_int("JWT_CLAIMS_CACHE_TTL", 300)
+    # revoked (logged out) tokens: "memory" (single process only) or "shared"
+    # with JWT_REVOCATION_CLIENT set to a redis-style client
+    JWT_REVOCATION = os.environ.get("JWT_REVOCATION", "memory")
+    JWT_REVOCATION_CLIENT = None
+
+    # task events go to these webhooks (URLs or {"url", "secret"} dicts), sent
+    # by `flask dispatch-webhooks`; with none set no events are recorded
+    WEBHOOK_ENDPOINTS = [
+        url for url in os.environ.get("WEBHOOK_URLS", "").split(",") if url
+    ]
+    WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+    WEBHOOK_BATCH_SIZE = _env_int("WEBHOOK_BATCH_SIZE", 100)
+    WEBHOOK_WORKERS = _env_int("WEBHOOK_WORKERS", 4)
+    WEBHOOK_TIMEOUT = _env_int("WEBHOOK_TIMEOUT", 5)  # seconds per request
+    WEBHOOK_BACKOFF_MAX = _env_int("WEBHOOK_BACKOFF_MAX", 300)  # seconds
+    # events are held back this long, so ids committed out of order aren't
+    # skipped by the endpoint cursors
+    WEBHOOK_SAFETY_WINDOW_MS = _env_int("WEBHOOK_SAFETY_WINDOW_MS", 1000)
+
+    # GET /tasks/stream (SSE): "memory" fans events out within this process
+    # (run a single worker), "none" turns the endpoint off
+    TASK_STREAM = os.environ.get("TASK_STREAM", "none")
+    # events kept per user with an open stream
+    TASK_STREAM_HISTORY = _env_int("TASK_STREAM_HISTORY", 100)
+    TASK_STREAM_QUEUE_SIZE = _env_int("TASK_STREAM_QUEUE_SIZE", 100)
+    TASK_STREAM_HEARTBEAT = _env_int("TASK_STREAM_HEARTBEAT", 15)  # seconds
+
+    # GET /tasks/changes: tokens stop this far behind now, so changes from
+    # transactions still committing are re-sent rather than missed
+    SYNC_SAFETY_WINDOW_MS = _env_int("SYNC_SAFETY_WINDOW_MS", 1000)
+    # deleted ids are kept this long; older sync tokens must do a full sync
+    SYNC_TOMBSTONE_RETENTION_DAYS = _env_int("SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+
+    # GET /tasks/export: rows fetched (and held in memory) per batch
+    EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 1000)
+    # POST /tasks/import: rows per INSERT, and row errors reported
+    IMPORT_BATCH_SIZE = _env_int("IMPORT_BATCH_SIZE", 1000)
+    IMPORT_MAX_ERRORS = _env_int("IMPORT_MAX_ERRORS", 100)
+    # request bodies above this get 413; imports are the largest, and run
+    # in one transaction, so this also bounds how long one holds the lock
+    MAX_CONTENT_LENGTH = _env_int("MAX_CONTENT_LENGTH", 16 * 1024 * 1024)
+
+    # words a task description may not contain, anywhere and in any case;
+    # None keeps schemas.FORBIDDEN_WORDS. Assign a new list to change it at
+    # runtime (the matcher is recompiled once, not per request)
+    FORBIDDEN_WORDS = _env_lines("FORBIDDEN_WORDS_FILE")
+
+    # opt-in request instrumentation: a Server-Timing header on every response
+    # and latency histograms at GET /metrics (see profiling.py)
+    PROFILING = _env_bool("PROFILING", False)
+    # bearer token for /metrics, which answers 404 while this is unset
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    # admins sending this header get the request profiled with cProfile
+    PROFILE_HEADER = "X-Profile"
+    PROFILE_DIR = os.environ.get(
+        "PROFILE_DIR", os.path.join(base_dir, "..", "instance", "profiles")
+    )
+    PROFILE_MAX_DUMPS = _env_int("PROFILE_MAX_DUMPS", 50)  # oldest are deleted
+
+    # staging aid: log statements repeated QUERY_REPEAT_THRESHOLD times in one
+    # request (N+1) and those slower than SLOW_QUERY_MS, with their plan
+    QUERY_AUDIT = _env_bool("QUERY_AUDIT", False)
+    QUERY_REPEAT_THRESHOLD = _env_int("QUERY_REPEAT_THRESHOLD", 5)
+    SLOW_QUERY_MS = _env_int("SLOW_QUERY_MS", 100)
+
+    # precomputed serializer for task lists; False falls back to marshmallow
+    TASK_FAST_SERIALIZER = True
+    # "auto" uses orjson when installed, else the stdlib encoder
+    JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto")
+
+
+class TestConfig(Config):
+    TESTING = True
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"  # cheap hashes keep tests fast
+    # point TEST_DATABASE_URL at a local Postgres to run the suite against it
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite:///:memory:")
+    TASK_STREAM = "memory"  # off by default, but the suite covers it
@@ -33,11 +33,18 @@ def handle_http_exception(err):
     elif code >= 500:
         current_app.logger.error("Server side error (%s): %s", code, message)
 
+    # keep headers the exception sets (Retry-After, Allow, ...); the body is JSON
+    headers = [
+        (key, value)
+        for key, value in err.get_headers()
+        if key.lower() != "content-type"
+    ]
     return (
         jsonify(
             {"error": {"code": code, "message": message, "type": name.replace(" ", "")}}
         ),
         code,
+        headers,
     )
 
 
@@ -0,0 +1,80 @@
+import csv
+import io
+import zlib
+
+from flask import current_app
+
+from . import db
+from .models import Task
+from .pagination import listing_query
+from .schemas import TASK_FIELDS
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_batches(user_id, completed=None, batch_size=1000):
+    """
+    The user's tasks as lists of rows, `batch_size` at a time.
+
+    The rows are fetched with a server-side cursor (yield_per turns on
+    stream_results), so only one batch is held in memory however many
+    tasks there are.
+    """
+    columns = [getattr(Task, field) for field in TASK_FIELDS]
+    query = listing_query(user_id, completed, "id", "asc", columns=columns)
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()  # also when the client disconnects mid-stream
+
+
+def ndjson_chunks(batches):
+    """One JSON object per line, one encoded chunk per batch."""
+    dumps = current_app.json.dumps
+    for rows in batches:
+        lines = [dumps(dict(zip(TASK_FIELDS, row))) for row in rows]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def csv_chunks(batches):
+    """A header row, then one encoded chunk of CSV lines per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TASK_FIELDS)
+    for rows in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # no rows: the header alone
+        yield buffer.getvalue().encode()
+
+
+def _csv_value(value):
+    # match the JSON output: ISO 8601 dates, lowercase booleans
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a chunk stream as one gzip member, flushing nothing early."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(user_id, export_format, completed=None, batch_size=1000):
+    batches = export_batches(user_id, completed, batch_size)
+    if export_format == "csv":
+        return csv_chunks(batches)
+    return ndjson_chunks(batches)
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+
+from flask import current_app
+from marshmallow import ValidationError
+
+from . import db
+from .models import Task, insert_tasks
+from .outbox import TASK_CREATED, record_task_events, task_events_enabled
+from .schemas import TASK_FIELDS, TaskSchema
+from .summaries import apply_delta
+
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+# the columns a row may set; anything else (an export's id, timestamps,
+# user_id) is ignored so an export can be imported back as is
+IMPORT_FIELDS = ("description", "completed", "priority")
+
+TASK_COLUMNS = [getattr(Task, field) for field in TASK_FIELDS]
+
+import_schema = TaskSchema()
+
+
+def ndjson_records(text):
+    """(row number, record) per non-blank line; a bad line gives None."""
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def csv_records(text):
+    """(row number, record) per CSV row after the header; blank cells are unset."""
+    for number, row in enumerate(csv.DictReader(text), start=1):
+        yield number, {
+            key: value for key, value in row.items() if value not in ("", None)
+        }
+
+
+def validated_rows(records, errors, max_errors):
+    """
+    Load each record with TaskSchema and yield the valid ones. Invalid rows
+    are counted in errors["failed"]; the first `max_errors` are kept with
+    their row numbers.
+    """
+    for number, record in records:
+        try:
+            if record is None:
+                raise ValidationError({"_schema": ["Row is not a JSON object."]})
+            yield import_schema.load(
+                {key: record[key] for key in IMPORT_FIELDS if key in record}
+            )
+        except ValidationError as err:
+            errors["failed"] += 1
+            if len(errors["rows"]) < max_errors:
+                errors["rows"].append({"row": number, "errors": err.messages})
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def insert_chunk(user_id, rows):
+    """One multi-row INSERT for a chunk of loaded rows; the caller commits."""
+    values = [dict(row, user_id=user_id) for row in rows]
+    if task_events_enabled(user_id):
+        # event payloads need the inserted rows back; plain rows are enough
+        # and skip building an ORM object per task
+        inserted = insert_tasks(values, columns=TASK_COLUMNS)
+        record_task_events(TASK_CREATED, inserted)
+    else:
+        db.session.execute(db.insert(Task), values)
+    apply_delta(
+        user_id,
+        total=len(values),
+        completed=sum(1 for row in values if row["completed"]),
+    )
+
+
+def import_tasks(user_id, stream, import_format):
+    """
+    Parse an upload incrementally and insert its valid rows in chunks of
+    IMPORT_BATCH_SIZE, so neither the body nor the parsed rows are ever
+    held whole. The chunks share one transaction: an upload that breaks
+    part way (bad bytes, too large, a database error) imports nothing.
+    """
+    config = current_app.config
+    # utf-8-sig skips the byte order mark spreadsheet exports start with
+    text = io.TextIOWrapper(
+        io.BufferedReader(stream), encoding="utf-8-sig", newline=""
+    )
+    records = csv_records(text) if import_format == "csv" else ndjson_records(text)
+    errors = {"failed": 0, "rows": []}
+    imported = 0
+    try:
+        rows = validated_rows(records, errors, config["IMPORT_MAX_ERRORS"])
+        for chunk in _chunks(rows, config["IMPORT_BATCH_SIZE"]):
+            insert_chunk(user_id, chunk)
+            imported += len(chunk)
+    except (UnicodeDecodeError, csv.Error) as err:
+        db.session.rollback()
+        problem = "not valid UTF-8" if isinstance(err, UnicodeDecodeError) else err
+        message = (
+            f"Upload stopped after {imported} rows ({problem}); nothing was imported."
+        )
+        raise ValidationError({"_body": [message]})
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return {
+        "imported": imported,
+        "failed": errors["failed"],
+        "errors": errors["rows"],
+    }
@@ -1,7 +1,50 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from datetime import datetime, timezone
 
+from sqlalchemy import DDL, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
 from . import db
+from .passwords import hash_password
+
+
+# evaluated per row (not once at import) so updated_at can back ETags.
+# Naive UTC, like the columns (timestamp without time zone) and the server
+# defaults: PostgreSQL would shift an aware value to the session TimeZone
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# SQLite stores DateTime as text and compares it as text, so every writer
+# must use the app's "YYYY-MM-DD HH:MM:SS.ffffff". CURRENT_TIMESTAMP has
+# no fraction and strftime() stops at milliseconds: pad to the end of the
+# millisecond so a server stamp never sorts before an app stamp taken in
+# the same millisecond.
+SQLITE_UTC_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '999'"
+
+
+class utc_now(FunctionElement):
+    """The database's current UTC time, in the same format the app writes."""
+
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    return f"({SQLITE_UTC_NOW})"
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    # CURRENT_TIMESTAMP would be cast to the session's time zone
+    return "timezone('utc', now())"
 
 
 class User(db.Model):
@@ -13,9 +56,13 @@ class User(db.Model):
     role = db.Column(db.String(20), default="user", nullable=False)
     # relation to task table
     tasks = db.relationship("Task", back_populates="user", cascade="all, delete-orphan")
+    task_summary = db.relationship(
+        "TaskSummary", uselist=False, cascade="all, delete-orphan"
+    )
 
-    def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+    # method defaults to the PASSWORD_HASH_METHOD config key
+    def set_password(self, password: str, method: str | None = None):
+        self.password_hash = hash_password(password, method)
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -23,19 +70,51 @@ class User(db.Model):
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    # composite indexes for the GET /tasks shapes: user_id [+ completed] + sort + id
+    __table_args__ = (
+        db.Index("ix_tasks_user_priority", "user_id", "priority", "id"),
+        db.Index("ix_tasks_user_created_at", "user_id", "created_at", "id"),
+        db.Index("ix_tasks_user_description", "user_id", "description", "id"),
+        db.Index("ix_tasks_user_completed", "user_id", "completed", "id"),
+        db.Index(
+            "ix_tasks_user_completed_priority", "user_id", "completed", "priority", "id"
+        ),
+        db.Index(
+            "ix_tasks_user_completed_created_at",
+            "user_id",
+            "completed",
+            "created_at",
+            "id",
+        ),
+        db.Index(
+            "ix_tasks_user_completed_description",
+            "user_id",
+            "completed",
+            "description",
+            "id",
+        ),
+        # GET /tasks/changes: a user's tasks in modification order
+        db.Index("ix_tasks_user_updated_at", "user_id", "updated_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255), nullable=False, index=True)
     completed = db.Column(db.Boolean, nullable=False, default=False)
     priority = db.Column(db.Integer, nullable=True)
+    # stamped per row by the app; server defaults (and the update trigger
+    # below) cover rows written with plain SQL
     created_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.now(timezone.utc)
+        db.DateTime,
+        nullable=False,
+        default=utcnow,
+        server_default=utc_now(),
     )
     updated_at = db.Column(
         db.DateTime,
         nullable=False,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=utc_now(),
     )
     # owner
     user_id = db.Column(
@@ -43,3 +122,110 @@ class Task(db.Model):
     )
 
     user = db.relationship("User", back_populates="tasks")
+
+
+# an UPDATE that leaves updated_at alone (plain SQL, other services) still
+# moves it; ORM and Core updates already set it through onupdate
+TOUCH_UPDATED_AT_DDL = {
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS tasks_touch_updated_at "
+        "AFTER UPDATE ON tasks FOR EACH ROW "
+        "WHEN new.updated_at IS old.updated_at BEGIN "
+        # DDL() %-formats the statement
+        f"UPDATE tasks SET updated_at = {SQLITE_UTC_NOW.replace('%', '%%')} "
+        "WHERE id = new.id; "
+        "END",
+    ],
+    "postgresql": [
+        "CREATE OR REPLACE FUNCTION tasks_touch_updated_at() RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN "
+        "NEW.updated_at := timezone('utc', now()); "
+        "END IF; "
+        "RETURN NEW; "
+        "END $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER tasks_touch_updated_at BEFORE UPDATE ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_touch_updated_at()",
+    ],
+}
+
+for dialect, statements in TOUCH_UPDATED_AT_DDL.items():
+    for statement in statements:
+        event.listen(
+            Task.__table__, "after_create", DDL(statement).execute_if(dialect=dialect)
+        )
+
+
+def insert_tasks(values, columns=None) -> list:
+    """
+    Multi-row INSERT ... RETURNING of tasks, results in the order of
+    `values`: Task objects, or rows of `columns` (which must include id).
+
+    SQLAlchemy can only promise that order on SQLite by inserting one row
+    per statement, so there the rows come back from a single statement and
+    are sorted by id instead; SQLite hands ids out in VALUES order.
+    """
+    in_order = db.session.get_bind().dialect.name != "sqlite"
+    if columns is None:
+        statement = db.insert(Task).returning(Task, sort_by_parameter_order=in_order)
+        results = db.session.scalars(statement, values).all()
+    else:
+        statement = db.insert(Task).returning(
+            *columns, sort_by_parameter_order=in_order
+        )
+        results = db.session.execute(statement, values).all()
+    return results if in_order else sorted(results, key=lambda task: task.id)
+
+
+# denormalized per-user counters, kept in the same transaction as task writes
+class TaskSummary(db.Model):
+    __tablename__ = "task_summaries"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    # time of the user's latest task change, deletes included; stamped by
+    # the database (see summaries.apply_delta)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utc_now())
+    # bumped by every change in the same UPDATE as the counters; listing
+    # ETags use it, since two writes can share a timestamp
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def open(self) -> int:
+        return self.total - self.completed
+
+
+# transactional outbox: written in the same commit as the task change it
+# describes, then delivered to webhooks by app.webhooks
+class TaskEvent(db.Model):
+    __tablename__ = "task_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(32), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)  # no FK: deleted tasks too
+    user_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+
+# deleted task ids, so incremental sync (GET /tasks/changes) can report them
+class TaskTombstone(db.Model):
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        db.Index("ix_task_tombstones_user_deleted_at", "user_id", "deleted_at", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+
+# how far each webhook endpoint has got through task_events
+class WebhookCursor(db.Model):
+    __tablename__ = "webhook_cursors"
+
+    endpoint = db.Column(db.String(255), primary_key=True)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
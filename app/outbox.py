@@ -0,0 +1,84 @@
+from flask import current_app
+
+from . import db
+from .models import TaskEvent
+from .serializers import task_serializer
+from .streams import queue_stream_events, task_stream
+from .sync import tombstone_deleted_tasks
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_COMPLETED = "task.completed"
+TASK_DELETED = "task.deleted"
+
+
+def outbox_enabled() -> bool:
+    # nothing consumes events without an endpoint, so don't write them
+    return bool(current_app.config["WEBHOOK_ENDPOINTS"])
+
+
+def streamed(user_id) -> bool:
+    # /tasks/stream only keeps events for users with an open stream
+    broker = task_stream()
+    return broker is not None and broker.has_subscribers(int(user_id))
+
+
+def task_events_enabled(user_id) -> bool:
+    """Whether the user's task writes produce events (webhooks or streams)."""
+    return outbox_enabled() or streamed(user_id)
+
+
+def record_task_events(event_type, tasks):
+    """
+    Queue one event per task in the current transaction: an outbox row for
+    the webhooks, and a message for /tasks/stream once it commits.
+    """
+    if not tasks:
+        return
+    outbox = outbox_enabled()
+    owners = {int(task.user_id) for task in tasks}
+    stream = {user_id for user_id in owners if streamed(user_id)}
+    if not (outbox or stream):
+        return
+    db.session.flush()  # ids and onupdate timestamps for the payload
+    _record(event_type, task_serializer.dump_many(tasks), outbox, stream)
+
+
+def record_deleted_tasks(user_id, task_ids):
+    """
+    Queue task.deleted events (the rows are gone, so only ids are sent) and
+    leave tombstones for /tasks/changes.
+    """
+    if not task_ids:
+        return
+    tombstone_deleted_tasks(user_id, task_ids)
+    user_id = int(user_id)
+    outbox = outbox_enabled()
+    stream = {user_id} if streamed(user_id) else set()
+    payloads = [{"id": task_id, "user_id": user_id} for task_id in sorted(task_ids)]
+    _record(TASK_DELETED, payloads, outbox, stream)
+
+
+def _record(event_type, payloads, outbox, stream):
+    if outbox:
+        db.session.execute(
+            db.insert(TaskEvent),
+            [
+                {
+                    "event_type": event_type,
+                    "task_id": payload["id"],
+                    "user_id": payload["user_id"],
+                    "payload": payload,
+                }
+                for payload in payloads
+            ],
+        )
+    if stream:
+        queue_stream_events(
+            db.session,
+            [
+                (payload["user_id"], event_type, payload)
+                for payload in payloads
+                if payload["user_id"] in stream
+            ],
+        )
@@ -0,0 +1,94 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from marshmallow import ValidationError
+from sqlalchemy import and_, or_, tuple_
+
+from . import db
+from .models import Task
+
+
+# opaque keyset cursors: base64url(json) of the last row's sort key + id.
+# the sort column/order is baked in so a cursor can't be replayed on another sort.
+def encode_cursor(task, sort_by: str, sort_order: str) -> str:
+    value = getattr(task, sort_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": task.id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """Return the (value, id) pair stored in a cursor made for this sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor does not match sort")
+        value, last_id = payload["v"], int(payload["id"])
+        if sort_by == "created_at" and value is not None:
+            value = datetime.fromisoformat(value)
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+    return value, last_id
+
+
+def order_by_clause(sort_by: str, sort_order: str):
+    """ORDER BY for a listing: the sort column, then id as a tiebreaker.
+
+    NULLs (only possible for priority) are placed explicitly, lowest as in
+    keyset_filter; PostgreSQL would otherwise sort them highest.
+    """
+    column = getattr(Task, sort_by)
+    if sort_order == "desc":
+        order = column.desc()
+        if column.nullable:
+            order = order.nulls_last()
+    else:
+        order = column.asc()
+        if column.nullable:
+            order = order.nulls_first()
+    if sort_by == "id":
+        return [order]
+    return [order, Task.id.desc() if sort_order == "desc" else Task.id.asc()]
+
+
+def keyset_filter(sort_by: str, sort_order: str, value, last_id: int):
+    """WHERE clause selecting the rows strictly after (value, last_id).
+
+    Row-value comparisons let the (user_id, <sort column>, id) indexes seek
+    straight to the cursor. NULLs (only possible for priority) sort lowest,
+    the placement order_by_clause spells out for every dialect.
+    """
+    column = getattr(Task, sort_by)
+    if sort_by == "id":
+        return column > last_id if sort_order == "asc" else column < last_id
+
+    key = tuple_(column, Task.id)
+    if sort_order == "asc":
+        if value is None:
+            return or_(and_(column.is_(None), Task.id > last_id), column.isnot(None))
+        return key > tuple_(value, last_id)
+
+    if value is None:
+        return and_(column.is_(None), Task.id < last_id)
+    return or_(key < tuple_(value, last_id), column.is_(None))
+
+
+def listing_query(
+    user_id, completed=None, sort_by="id", sort_order="asc", columns=None
+):
+    """The SELECT behind GET /tasks, before pagination is applied.
+
+    With `columns` only those Task columns are selected (rows, not entities).
+    """
+    query = db.select(*columns) if columns else db.select(Task)
+    query = query.filter(Task.user_id == user_id)
+    if completed is not None:
+        query = query.filter(Task.completed == completed)
+    if sort_by == "rank":
+        return query  # ordered by the search (see search.apply_search)
+    return query.order_by(*order_by_clause(sort_by, sort_order))
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt"
+RETRY_AFTER = 1  # seconds, sent with the 503 of a saturated pool
+
+
+def hash_password(password: str, method: str | None = None) -> str:
+    if method is None and has_app_context():
+        method = current_app.config.get("PASSWORD_HASH_METHOD")
+    return generate_password_hash(password, method=method or DEFAULT_METHOD)
+
+
+def needs_rehash(pwhash: str, method: str) -> bool:
+    """True when the stored hash was made with other method/cost parameters."""
+    return pwhash.split("$", 1)[0] != _method_prefix(method)
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method: str) -> str:
+    # let werkzeug expand defaults, e.g. "scrypt" -> "scrypt:32768:8:1"
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def verify_and_rehash(pwhash: str, password: str, method: str):
+    """Return (valid, new_hash); new_hash is set when the stored one is outdated."""
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if needs_rehash(pwhash, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class HashingPoolFull(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing.
+
+    At most `workers` hashes run at once and `queue_limit` more may wait;
+    beyond that `run` raises HashingPoolFull right away instead of queueing.
+    """
+
+    def __init__(self, workers: int, queue_limit: int = 0):
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="password")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def run(self, fn, *args, timeout=None):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_hashing(fn, *args):
+    """
+    Run fn on the app's hashing pool if one is configured, else inline.
+    A full pool, or a hash still waiting after PASSWORD_HASH_TIMEOUT, is a
+    503 with Retry-After. fn runs without an app context, so pass it
+    everything it needs.
+    """
+    pool = current_app.extensions.get("password_pool")
+    if pool is None:
+        return fn(*args)
+    try:
+        return pool.run(fn, *args, timeout=current_app.config["PASSWORD_HASH_TIMEOUT"])
+    except (HashingPoolFull, FutureTimeout):
+        raise ServiceUnavailable(
+            "Too many password checks in progress, try again shortly",
+            retry_after=RETRY_AFTER,
+        )
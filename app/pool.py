@@ -0,0 +1,86 @@
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to get a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = WaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the running totals
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class WaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config) -> dict:
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* config keys."""
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {"pool_pre_ping": config["DB_POOL_PRE_PING"]}
+
+    # in-memory SQLite is pinned to a single connection by Flask-SQLAlchemy
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_timeout=config["DB_POOL_TIMEOUT"],
+            pool_recycle=config["DB_POOL_RECYCLE"],
+        )
+        if config["DB_POOL_METRICS"]:
+            options["poolclass"] = MeteredQueuePool
+
+    timeout = config["DB_STATEMENT_TIMEOUT_MS"]
+    if timeout and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def pool_metrics(engine) -> dict:
+    """Snapshot of checked-out connections, overflow and checkout wait time."""
+    pool = engine.pool
+    snapshot = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),  # negative while under size
+        )
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        snapshot.update(
+            checkouts=stats.count,
+            wait_ms_total=round(stats.total * 1000, 3),
+            wait_ms_max=round(stats.max * 1000, 3),
+        )
+    return snapshot
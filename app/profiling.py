@@ -0,0 +1,292 @@
+import bisect
+import contextlib
+import cProfile
+import hmac
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# phases timed inside a request, in Server-Timing order; they can overlap
+# (SQL run while serializing counts for both)
+PHASES = ("jwt", "schema", "sql", "serialize", "json")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+_NOT_TIMED = contextlib.nullcontext()
+
+
+class RequestTimings:
+    """Seconds and call counts per phase for one request."""
+
+    __slots__ = ("start", "phases")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+
+    def add(self, phase, seconds):
+        entry = self.phases.get(phase)
+        if entry is None:
+            self.phases[phase] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def count(self, phase) -> int:
+        return self.phases.get(phase, (0, 0))[1]
+
+    def server_timing(self, total) -> str:
+        parts = []
+        for phase in PHASES:
+            if phase in self.phases:
+                seconds, calls = self.phases[phase]
+                parts.append(f'{phase};dur={seconds * 1000:.2f};desc="{calls}x"')
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class _Phase:
+    __slots__ = ("timings", "phase", "start")
+
+    def __init__(self, timings, phase):
+        self.timings = timings
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.phase, time.perf_counter() - self.start)
+
+
+def current_timings():
+    """The running request's RequestTimings, or None when not profiling."""
+    if not has_request_context():
+        return None
+    return g.get("request_timings")
+
+
+def timed(phase):
+    """
+    Time a block as one of PHASES; a no-op unless PROFILING is on.
+    Example:
+        with timed("schema"):
+            data = schema.load(payload)
+    """
+    timings = current_timings()
+    if timings is None:
+        return _NOT_TIMED
+    return _Phase(timings, phase)
+
+
+class Histogram:
+    """A Prometheus-style cumulative histogram, per label set."""
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, values in series:
+            labels = [
+                f'{label}="{_escape(value)}"'
+                for label, value in zip(self.labels, label_values)
+            ]
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                bucket_labels = ",".join(labels + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            bucket_labels = ",".join(labels + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{bucket_labels}}} {values[-1]}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {values[-1]}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds",
+            "Time to build the response, by method and endpoint.",
+            LATENCY_BUCKETS,
+            labels=("method", "endpoint", "status"),
+        )
+        self.phase_latency = Histogram(
+            "http_request_phase_seconds",
+            "Time spent in each phase of a request.",
+            LATENCY_BUCKETS,
+            labels=("phase",),
+        )
+        self.statements = Histogram(
+            "http_request_sql_statements",
+            "SQL statements run per request, by endpoint.",
+            STATEMENT_BUCKETS,
+            labels=("endpoint",),
+        )
+
+    def observe(self, timings, total, endpoint, response):
+        status = f"{response.status_code // 100}xx"
+        self.request_latency.observe(total, request.method, endpoint, status)
+        for phase, (seconds, _) in timings.phases.items():
+            self.phase_latency.observe(seconds, phase)
+        self.statements.observe(timings.count("sql"), endpoint)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in (self.request_latency, self.phase_latency, self.statements):
+            lines += histogram.render()
+        return "\n".join(lines) + "\n"
+
+
+# SQL time comes from the cursor events of every engine
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if current_timings() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    timings = current_timings()
+    starts = conn.info.get("query_start")
+    if timings is not None and starts:
+        timings.add("sql", time.perf_counter() - starts.pop())
+
+
+def _listen_for_queries():
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# cProfile dumps, one request at a time, for admins who send PROFILE_HEADER
+_profile_lock = threading.Lock()
+
+
+def _wants_profile() -> bool:
+    if not request.headers.get(current_app.config["PROFILE_HEADER"]):
+        return False
+    from .utils.policy import current_principal
+
+    try:
+        return current_principal().has("admin:read")
+    except Exception:
+        return False  # no or bad token: the view reports that itself
+
+
+def _start_profile():
+    if not _wants_profile() or not _profile_lock.acquire(blocking=False):
+        return
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+
+def _finish_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+        response.headers["X-Profile-Dump"] = _dump_profile(profiler)
+    finally:
+        _profile_lock.release()
+
+
+def _abandon_profile(exc=None):
+    # the request failed before after_request ran
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+
+
+def _dump_profile(profiler) -> str:
+    directory = current_app.config["PROFILE_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    endpoint = (request.endpoint or "unknown").replace(".", "-")
+    name = f"{stamp}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(os.path.join(directory, name))
+
+    dumps = sorted(f for f in os.listdir(directory) if f.endswith(".prof"))
+    for old in dumps[: -current_app.config["PROFILE_MAX_DUMPS"]]:
+        os.remove(os.path.join(directory, old))
+    return name
+
+
+def _start_request():
+    g.request_timings = RequestTimings()
+    _start_profile()
+
+
+def _finish_request(response):
+    timings = g.pop("request_timings", None)
+    if timings is None:
+        return response
+    _finish_profile(response)
+    total = time.perf_counter() - timings.start
+    response.headers["Server-Timing"] = timings.server_timing(total)
+    current_app.extensions["metrics"].observe(
+        timings, total, request.endpoint or "unmatched", response
+    )
+    return response
+
+
+def metrics_view():
+    token = current_app.config["METRICS_TOKEN"]
+    # fail closed: endpoint names and latencies aren't for anonymous callers
+    if not token:
+        abort(404, description="Metrics are off until METRICS_TOKEN is set")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(401, description="Missing or wrong metrics token")
+    body = current_app.extensions["metrics"].render()
+    return current_app.response_class(
+        body, content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def init_profiling(app):
+    """
+    Time every request by phase (see PHASES) when PROFILING is on: the
+    result goes out as a Server-Timing header and into the histograms at
+    /metrics. Call it before other before_request hooks are registered, so
+    the total covers them too.
+    """
+    if not app.config["PROFILING"]:
+        return
+    app.extensions["metrics"] = Metrics()
+    _listen_for_queries()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_abandon_profile)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
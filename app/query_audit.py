@@ -0,0 +1,129 @@
+import contextlib
+import logging
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.queries")
+
+EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+@contextlib.contextmanager
+def count_statements(engine):
+    """
+    Collect the SQL statements run on `engine` inside the block.
+    Example:
+        with count_statements(db.engine) as statements:
+            client.get("/tasks")
+        assert len(statements) <= 3
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class RequestQueries:
+    """Statement counts and slow statements seen during one request."""
+
+    __slots__ = ("counts", "slow")
+
+    def __init__(self):
+        self.counts = {}
+        self.slow = []  # (seconds, statement, plan)
+
+
+def _current_queries():
+    if not has_request_context():
+        return None
+    return g.get("request_queries")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current_queries() is not None:
+        conn.info.setdefault("audit_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    queries = _current_queries()
+    starts = conn.info.get("audit_start")
+    if queries is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    queries.counts[statement] = queries.counts.get(statement, 0) + 1
+    if elapsed * 1000 >= current_app.config["SLOW_QUERY_MS"]:
+        plan = None if many else _explain(conn, statement, parameters)
+        queries.slow.append((elapsed, statement, plan))
+
+
+def _explain(conn, statement, parameters):
+    prefix = EXPLAIN.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    # a second DBAPI cursor: the statement's own results are not fetched yet,
+    # and the EXPLAIN is not audited itself
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as err:  # a plan is a nice-to-have, never an error
+        return f"(no plan: {err})"
+    finally:
+        cursor.close()
+
+
+def _start_request():
+    g.request_queries = RequestQueries()
+
+
+def _report_request(response):
+    queries = g.pop("request_queries", None)
+    if queries is None:
+        return response
+    threshold = current_app.config["QUERY_REPEAT_THRESHOLD"]
+    for statement, count in queries.counts.items():
+        if count >= threshold:
+            logger.warning(
+                "%s %s ran the same statement %d times (N+1?): %s",
+                request.method,
+                request.path,
+                count,
+                statement,
+            )
+    for seconds, statement, plan in queries.slow:
+        logger.warning(
+            "%s %s slow query (%.1f ms): %s\nplan:\n%s",
+            request.method,
+            request.path,
+            seconds * 1000,
+            statement,
+            plan or "(not available)",
+        )
+    return response
+
+
+def init_query_audit(app):
+    """
+    In QUERY_AUDIT mode (for staging), log statements repeated
+    QUERY_REPEAT_THRESHOLD times within one request, and statements slower
+    than SLOW_QUERY_MS together with their EXPLAIN plan.
+    """
+    if not app.config["QUERY_AUDIT"]:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_report_request)
@@ -1,8 +1,44 @@
-from flask import Blueprint, request, jsonify, abort
+from math import ceil
+
+from flask import (
+    Blueprint,
+    request,
+    jsonify,
+    abort,
+    current_app,
+    stream_with_context,
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from .models import db, Task
-from .schemas import TaskSchema, TaskFilterSchema
-from .utils.decorators import admin_required, role_required
+from .models import db, Task, insert_tasks
+from .schemas import (
+    TaskSchema,
+    TaskFilterSchema,
+    TaskBulkUpdateSchema,
+    TaskBulkDeleteSchema,
+    TaskSummarySchema,
+    TaskChangesSchema,
+    TaskExportSchema,
+)
+from .serializers import dump_tasks, task_serializer
+from .cache import listing_cache, listing_key
+from .pool import pool_metrics
+from .summaries import apply_delta, get_summary, refresh_summary, summary_count
+from .search import apply_search
+from .streams import sse_events, task_stream
+from .sync import changes_since
+from .export import EXPORT_FORMATS, export_chunks, gzip_chunks
+from .imports import IMPORT_FORMATS, import_tasks
+from .outbox import (
+    TASK_COMPLETED,
+    TASK_CREATED,
+    TASK_UPDATED,
+    record_deleted_tasks,
+    record_task_events,
+)
+from .pagination import decode_cursor, encode_cursor, keyset_filter, listing_query
+from .utils.decorators import permission_required
+from .utils.policy import can
+from .utils.etags import listing_etag, not_modified, require_match, task_etag
 from . import db
 
 
@@ -11,6 +47,13 @@ bp = Blueprint("tasks", __name__)
 task_schema = TaskSchema()
 tasks_schema = TaskSchema(many=True)
 task_filter_schema = TaskFilterSchema()
+bulk_update_schema = TaskBulkUpdateSchema(many=True)
+bulk_delete_schema = TaskBulkDeleteSchema()
+task_summary_schema = TaskSummarySchema()
+task_changes_schema = TaskChangesSchema()
+task_export_schema = TaskExportSchema()
+
+BULK_MAX_ITEMS = 1000
 
 
 # health check
@@ -28,8 +71,170 @@ def create_task():
 
     task = Task(user_id=user_id, **data)
     db.session.add(task)
+    apply_delta(user_id, total=1, completed=int(task.completed))
+    record_task_events(TASK_CREATED, [task])
+    db.session.commit()
+    return _task_response(task_schema.dump(task), task_etag(task)), 201
+
+
+def _task_response(serialized_task, etag):
+    response = jsonify(serialized_task)
+    response.set_etag(etag)
+    return response
+
+
+# bulk create: one validation pass, one multi-row INSERT, one commit
+@bp.post("/tasks/bulk")
+@jwt_required()
+def create_tasks_bulk():
+    payload = _bulk_payload()
+    data = tasks_schema.load(payload)
+    user_id = get_jwt_identity()
+
+    tasks = insert_tasks([dict(item, user_id=user_id) for item in data])
+    apply_delta(
+        user_id,
+        total=len(tasks),
+        completed=sum(1 for task in tasks if task.completed),
+    )
+    record_task_events(TASK_CREATED, tasks)
+    # dump before commit: it expires the rows, and reloading them would cost
+    # one SELECT per task
+    items = dump_tasks(tasks)
+    db.session.commit()
+    return jsonify({"items": items}), 201
+
+
+# bulk partial update: rows sharing the same changes go out as one
+# UPDATE ... WHERE id IN (...) AND user_id = ?
+@bp.patch("/tasks/bulk")
+@jwt_required()
+def update_tasks_bulk():
+    payload = _bulk_payload()
+    data = bulk_update_schema.load(
+        payload, partial=("description", "completed", "priority")
+    )
+    ids = [item["id"] for item in data]
+    duplicates = sorted({task_id for task_id in ids if ids.count(task_id) > 1})
+    if duplicates:
+        # which of two changes to one task wins would depend on grouping order
+        listed = ", ".join(map(str, duplicates))
+        abort(400, description=f"Task ids appear more than once: {listed}")
+    user_id = get_jwt_identity()
+
+    current = _owned_task_values(user_id, ids)
+
+    # only values that differ from the stored row are written: an item that
+    # changes nothing gets no UPDATE, no event and no summary change
+    changes = {}
+    for item in data:
+        if item["id"] not in current:
+            continue
+        values = {k: v for k, v in item.items() if k != "id"}
+        if "completed" in values:
+            values["completed"] = bool(values["completed"])
+        stored = current[item["id"]]
+        values = {k: v for k, v in values.items() if stored[k] != v}
+        if values:
+            changes.setdefault(tuple(sorted(values.items())), []).append(item["id"])
+
+    changed_ids = set()
+    for values, ids in changes.items():
+        db.session.execute(
+            db.update(Task)
+            .where(Task.id.in_(ids), Task.user_id == user_id)
+            .values(dict(values))
+        )
+        changed_ids.update(ids)
+    if changed_ids:
+        refresh_summary(user_id)
+
+    # read back before commit so the outbox events share the transaction
+    tasks = db.session.scalars(
+        db.select(Task)
+        .filter(Task.id.in_(current), Task.user_id == user_id)
+        .execution_options(populate_existing=True)
+    ).all()
+    record_task_events(
+        TASK_UPDATED, [task for task in tasks if task.id in changed_ids]
+    )
+    by_id = {task["id"]: task for task in task_serializer.dump_many(tasks)}
     db.session.commit()
-    return jsonify(task_schema.dump(task)), 201
+
+    results = []
+    for item in data:
+        task = by_id.get(item["id"])
+        if task is None:
+            results.append(
+                {"id": item["id"], "status": 404, "error": "Task not found"}
+            )
+        else:
+            results.append(
+                {
+                    "id": task["id"],
+                    "status": 200,
+                    "changed": task["id"] in changed_ids,
+                    "task": task,
+                }
+            )
+    return jsonify({"items": results}), 200
+
+
+# bulk delete: body {"ids": [...]}
+@bp.delete("/tasks/bulk")
+@jwt_required()
+def delete_tasks_bulk():
+    data = bulk_delete_schema.load(request.get_json(silent=True) or {})
+    ids = data["ids"]
+    if len(ids) > BULK_MAX_ITEMS:
+        abort(400, description=f"At most {BULK_MAX_ITEMS} items per bulk request")
+    user_id = get_jwt_identity()
+
+    owned_ids = _owned_task_ids(user_id, ids)
+    if owned_ids:
+        db.session.execute(
+            db.delete(Task).where(Task.id.in_(owned_ids), Task.user_id == user_id)
+        )
+        refresh_summary(user_id)
+        record_deleted_tasks(user_id, owned_ids)
+    db.session.commit()
+
+    results = [
+        (
+            {"id": task_id, "status": 204}
+            if task_id in owned_ids
+            else {"id": task_id, "status": 404, "error": "Task not found"}
+        )
+        for task_id in ids
+    ]
+    return jsonify({"items": results}), 200
+
+
+def _bulk_payload():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        abort(400, description="Expected a non-empty JSON array")
+    if len(payload) > BULK_MAX_ITEMS:
+        abort(400, description=f"At most {BULK_MAX_ITEMS} items per bulk request")
+    return payload
+
+
+def _owned_task_values(user_id, ids):
+    """id -> the writable fields of the caller's tasks among ids."""
+    rows = db.session.execute(
+        db.select(Task.id, Task.description, Task.completed, Task.priority).filter(
+            Task.id.in_(ids), Task.user_id == user_id
+        )
+    )
+    return {row.id: row._mapping for row in rows}
+
+
+def _owned_task_ids(user_id, ids):
+    return set(
+        db.session.scalars(
+            db.select(Task.id).filter(Task.id.in_(ids), Task.user_id == user_id)
+        )
+    )
 
 
 # read all
@@ -41,62 +246,268 @@ def list_all():
 
     page = filters["page"]
     per_page = filters["per_page"]
+    sort_by = filters["sort_by"]
+    sort_order = filters["sort_order"]
+
+    # Response cache: a hit skips the database entirely
+    cache = listing_cache()
+    if cache is not None:
+        cache_key = listing_key(cache, user_id, filters)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            etag, body = entry
+            return not_modified(etag) or _cached_response(body, etag)
+
+    # Conditional GET: answer 304 before running the page query
+    summary = get_summary(user_id)
+    etag = listing_etag(summary, filters)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    # Filtering and sorting (id breaks ties so pages are stable)
+    # fields=... selects only those columns and skips building ORM objects
+    query = listing_query(
+        user_id,
+        filters["completed"],
+        sort_by,
+        sort_order,
+        columns=_projected_columns(filters),
+    )
 
-    query = db.select(Task).filter_by(user_id=user_id)
+    # meta.total comes from the maintained summary, not a COUNT(*);
+    # a search has to count its matches. The count always uses the unranked
+    # (IN subquery) form: joined to the index, SQLite may probe it per task.
+    if filters["q"] is not None:
+        total = None
+        if filters["include_total"]:
+            total = _count_tasks(apply_search(query, filters["q"], user_id))
+        query = apply_search(query, filters["q"], user_id, rank=sort_by == "rank")
+    else:
+        total = summary_count(summary, filters["completed"])
+
+    # Keyset pagination: seek past the last row instead of OFFSET
+    if filters["cursor"] is not None:
+        response = _list_by_cursor(query, filters, total)
+    # Pagination
+    elif not filters["include_total"]:
+        response = _list_without_count(query, filters)
+    else:
+        response = _list_by_page(query, filters, total)
 
-    # Filtering
-    if filters["completed"] is not None:
-        query = query.filter(Task.completed == filters["completed"])
+    response.set_etag(etag)
+    if cache is not None:
+        cache.set(cache_key, (etag, response.get_data()))
+    return response, 200
 
-    # Sorting
-    sort_attr = getattr(Task, filters["sort_by"])
-    if filters["sort_order"] == "desc":
-        sort_attr = sort_attr.desc()
-    query = query.order_by(sort_attr)
 
-    # Pagination
-    pagination = db.paginate(
-        query,
-        page=page,
-        per_page=per_page,
-        error_out=False,  # prevent 404 if page is empty.
+def _cached_response(body, etag):
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+def _projected_columns(filters):
+    if filters["only_fields"] is None:
+        return None
+    # the sort column is needed for cursors even when it isn't returned
+    names = filters["only_fields"]
+    if filters["sort_by"] != "rank":
+        names += (filters["sort_by"],)
+    return [getattr(Task, name) for name in dict.fromkeys(names)]
+
+
+def _count_tasks(query):
+    count_query = query.order_by(None).with_only_columns(db.func.count(Task.id))
+    return db.session.execute(count_query).scalar()
+
+
+def _fetch(query, filters):
+    result = db.session.execute(query)
+    if filters["only_fields"] is None:
+        return result.scalars().all()
+    return result.all()  # plain Row tuples, no identity map
+
+
+def _dump(rows, filters):
+    return dump_tasks(rows, only=filters["only_fields"])
+
+
+def _list_by_page(query, filters, total):
+    page = filters["page"]
+    per_page = filters["per_page"]
+
+    rows = _fetch(query.limit(per_page).offset((page - 1) * per_page), filters)
+
+    if page > 1 and not rows:
+        abort(404, description="Page not found")
+
+    pages = ceil(total / per_page)
+    return jsonify(
+        {
+            "meta": {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "pages": pages,
+                "has_next": page < pages,
+                "has_prev": page > 1,
+            },
+            "items": _dump(rows, filters),
+        }
     )
 
-    if pagination.page > 1 and not pagination.items:
+
+# offset page without COUNT(*); fetch one extra row to know if there is a next page
+def _list_without_count(query, filters):
+    page = filters["page"]
+    per_page = filters["per_page"]
+    rows = _fetch(query.limit(per_page + 1).offset((page - 1) * per_page), filters)
+    if page > 1 and not rows:
         abort(404, description="Page not found")
 
-    items = tasks_schema.dump(pagination.items)
-
-    return (
-        jsonify(
-            {
-                "meta": {
-                    "page": pagination.page,
-                    "per_page": pagination.per_page,
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "has_next": pagination.has_next,
-                    "has_prev": pagination.has_prev,
-                },
-                "items": items,
-            }
-        ),
-        200,
+    return jsonify(
+        {
+            "meta": {
+                "page": page,
+                "per_page": per_page,
+                "has_next": len(rows) > per_page,
+                "has_prev": page > 1,
+            },
+            "items": _dump(rows[:per_page], filters),
+        }
+    )
+
+
+def _list_by_cursor(query, filters, total):
+    per_page = filters["per_page"]
+    sort_by = filters["sort_by"]
+    sort_order = filters["sort_order"]
+
+    meta = {"per_page": per_page}
+    if filters["include_total"]:
+        meta["total"] = total
+
+    if filters["cursor"]:
+        value, last_id = decode_cursor(filters["cursor"], sort_by, sort_order)
+        query = query.filter(keyset_filter(sort_by, sort_order, value, last_id))
+
+    rows = _fetch(query.limit(per_page + 1), filters)
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    meta["has_next"] = has_next
+    meta["next_cursor"] = (
+        encode_cursor(rows[-1], sort_by, sort_order) if has_next else None
+    )
+    return jsonify({"meta": meta, "items": _dump(rows, filters)})
+
+
+# incremental sync: tasks changed and ids deleted since a token
+@bp.get("/tasks/changes")
+@jwt_required()
+def task_changes():
+    args = task_changes_schema.load(request.args)
+    changes = changes_since(get_jwt_identity(), args["since"], args["limit"])
+    return {
+        "changes": dump_tasks(changes["tasks"]),
+        "deleted": changes["deleted"],
+        "next": changes["next"],
+        "has_more": changes["has_more"],
+    }, 200
+
+
+# every task of the user, streamed as NDJSON or CSV
+@bp.get("/tasks/export")
+@jwt_required()
+def export_tasks():
+    args = task_export_schema.load(request.args)
+    export_format = args["format"]
+    chunks = export_chunks(
+        get_jwt_identity(),
+        export_format,
+        args["completed"],
+        current_app.config["EXPORT_BATCH_SIZE"],
+    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="tasks.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if request.accept_encodings["gzip"]:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    # the app context (and its session) stays open while the body streams
+    return current_app.response_class(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers=headers,
+    )
+
+
+# bulk import from a streamed NDJSON or CSV upload (at most
+# MAX_CONTENT_LENGTH bytes), all or nothing; invalid rows are skipped and
+# reported by row number
+@bp.post("/tasks/import")
+@jwt_required()
+def import_tasks_upload():
+    import_format = IMPORT_FORMATS.get(request.mimetype)
+    if import_format is None:
+        abort(
+            415,
+            description=f"Content-Type must be one of {', '.join(IMPORT_FORMATS)}",
+        )
+    result = import_tasks(get_jwt_identity(), request.stream, import_format)
+    return jsonify(result), 200
+
+
+# push feed of the user's task changes (Server-Sent Events)
+@bp.get("/tasks/stream")
+@jwt_required()
+def stream_tasks():
+    broker = task_stream()
+    if broker is None:
+        abort(404, description="Task stream is disabled")
+    user_id = int(get_jwt_identity())
+
+    # EventSource resends the last id it saw when it reconnects
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id is not None:
+        try:
+            last_event_id = broker.parse_event_id(last_event_id)
+        except ValueError:
+            abort(400, description="Last-Event-ID is not a task stream event id")
+
+    subscription, backlog = broker.subscribe(user_id, last_event_id)
+    heartbeat = current_app.config["TASK_STREAM_HEARTBEAT"]
+    return current_app.response_class(
+        sse_events(broker, subscription, backlog, heartbeat),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+# counts served from the per-user summary
+@bp.get("/tasks/stats")
+@jwt_required()
+def task_stats():
+    summary = get_summary(get_jwt_identity())
+    return jsonify(task_summary_schema.dump(summary)), 200
+
+
 # read one
 @bp.get("/tasks/<int:task_id>")
-@jwt_required()
+@permission_required("tasks:own")
 def get_task(task_id: int):
-    user_id = get_jwt_identity()
-    task_from_db = db.session.execute(
-        db.select(Task).filter_by(id=task_id, user_id=user_id)
-    ).scalar_one_or_none()
-    if not task_from_db:
+    task_from_db = db.session.get(Task, task_id)
+    # owners only (see policy.RESOURCE_RULES)
+    if not task_from_db or not can("tasks:read", task_from_db):
         abort(404, description="Task not found")
+    etag = task_etag(task_from_db)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     serialized_task = task_schema.dump(task_from_db)
-    return jsonify(serialized_task), 200
+    return _task_response(serialized_task, etag), 200
 
 
 # update full or partial
@@ -109,8 +520,10 @@ def update_task(task_id: int):
     ).scalar_one_or_none()
     if not task_from_db:
         abort(404, description="Task not found")
+    require_match(task_etag(task_from_db))
 
     data = task_schema.load(request.get_json(silent=True) or {}, partial=True)
+    was_completed = task_from_db.completed
     if "description" in data:
         task_from_db.description = data["description"]
     if "completed" in data:
@@ -118,9 +531,15 @@ def update_task(task_id: int):
     if "priority" in data:
         task_from_db.priority = data["priority"]
 
-    db.session.commit()
+    # values equal to the stored ones leave the row unmodified
+    if db.session.is_modified(task_from_db):
+        apply_delta(
+            user_id, completed=int(task_from_db.completed) - int(was_completed)
+        )
+        record_task_events(TASK_UPDATED, [task_from_db])
+        db.session.commit()
     serialized_task = task_schema.dump(task_from_db)
-    return jsonify(serialized_task), 200
+    return _task_response(serialized_task, task_etag(task_from_db)), 200
 
 
 # mark complete
@@ -133,10 +552,15 @@ def mark_complete(task_id: int):
     ).scalar_one_or_none()
     if not task_from_db:
         abort(404, description="task not found")
-    task_from_db.completed = True
-    db.session.commit()
+    require_match(task_etag(task_from_db))
+    # completing a completed task changes nothing: no event, no new ETags
+    if not task_from_db.completed:
+        apply_delta(user_id, completed=1)
+        task_from_db.completed = True
+        record_task_events(TASK_COMPLETED, [task_from_db])
+        db.session.commit()
     serialized_task = task_schema.dump(task_from_db)
-    return jsonify(serialized_task), 200
+    return _task_response(serialized_task, task_etag(task_from_db)), 200
 
 
 # delete
@@ -149,31 +573,48 @@ def delete_task(task_id):
     ).scalar_one_or_none()
     if not task:
         abort(404, description="task not found")
+    require_match(task_etag(task))
     db.session.delete(task)
+    apply_delta(user_id, total=-1, completed=-int(task.completed))
+    record_deleted_tasks(user_id, [task.id])
     db.session.commit()
     return "", 204
 
 
 # special delete route, where by only admin can use.
 @bp.delete("/admin/tasks/<int:task_id>")
-@admin_required()
-@jwt_required()
+@permission_required("tasks:delete_any")
 def delete_all_task(task_id):
-    task = db.session.execute(db.select(Task).filter(id=task_id)).scalar_one_or_none()
+    task = db.session.get(Task, task_id)
     if not task:
         abort(404, description="task not found")
     db.session.delete(task)
+    apply_delta(task.user_id, total=-1, completed=-int(task.completed))
+    record_deleted_tasks(task.user_id, [task.id])
     db.session.commit()
     return "", 204
 
 
 @bp.get("/admin/dashboard")
-@admin_required()
+@permission_required("admin:read")
 def admin_dashboard():
     return {"message": "adminstrator dashboard"}
 
 
+@bp.get("/admin/db-pool")
+@permission_required("admin:read")
+def admin_db_pool():
+    return pool_metrics(db.engine)
+
+
+@bp.get("/admin/cache")
+@permission_required("admin:read")
+def admin_cache():
+    cache = listing_cache()
+    return cache.metrics() if cache is not None else {"backend": "none"}
+
+
 @bp.get("/reports")
-@role_required("admin", "manager")
+@permission_required("reports:read")
 def reports():
     return {"message": "Reports visible for admins & managers"}
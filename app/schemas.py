@@ -4,24 +4,48 @@ from marshmallow import (
     validate,
     validates,
     pre_load,
+    post_load,
     post_dump,
     ValidationError,
     validates_schema,
     EXCLUDE,
 )
 from .models import User
+from .profiling import timed
+from .validators import DescriptionValidator
 
+# used when the FORBIDDEN_WORDS config key is unset (see validators.py)
 FORBIDDEN_WORDS = ["shrek", "dummy"]
+# task attributes a listing can be projected onto (see TaskFilterSchema.fields)
+TASK_FIELDS = [
+    "id",
+    "description",
+    "completed",
+    "priority",
+    "created_at",
+    "updated_at",
+    "user_id",
+]
 
 
-class TaskSchema(Schema):
+class BaseSchema(Schema):
+    """Schema whose loads and dumps count in the request timings (see profiling)."""
+
+    def load(self, data, **kwargs):
+        with timed("schema"):
+            return super().load(data, **kwargs)
+
+    def dump(self, obj, **kwargs):
+        with timed("serialize"):
+            return super().dump(obj, **kwargs)
+
+
+class TaskSchema(BaseSchema):
     id = fields.Int(dump_only=True)
+    # length, characters and forbidden words in one precompiled check
     description = fields.Str(
         required=True,
-        validate=[
-            validate.Length(min=3, max=120),
-            validate.Regexp(r"^[a-zA-Z0-9 ]+$", error="No special characters allowed"),
-        ],
+        validate=DescriptionValidator(min=3, max=120, default_words=FORBIDDEN_WORDS),
     )
     completed = fields.Bool(required=False, load_default=False)
     priority = fields.Int(required=False, allow_none=True)
@@ -29,15 +53,6 @@ class TaskSchema(Schema):
     updated_at = fields.DateTime(dump_only=True)
     user_id = fields.Int(dump_only=True)
 
-    # validate against forbidden words
-    @validates("description")
-    def validate_forbidden_words(self, value, **kwargs):
-        lowerd_value = value.lower()
-        if any(word in lowerd_value for word in FORBIDDEN_WORDS):
-            raise ValidationError(
-                f"Task description can not contain: {', '.join(FORBIDDEN_WORDS)}"
-            )
-
     @validates_schema
     def validate_description_content(self, data, **kwargs):
         if data.get("completed") and not data.get("description"):
@@ -62,24 +77,101 @@ class TaskSchema(Schema):
         return data
 
 
-class TaskFilterSchema(Schema):
+# bulk PATCH item: the usual task fields plus the id being updated
+class TaskBulkUpdateSchema(TaskSchema):
+    id = fields.Int(required=True)
+
+
+class TaskBulkDeleteSchema(BaseSchema):
+    ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1))
+
+
+class TaskSummarySchema(BaseSchema):
+    total = fields.Int()
+    completed = fields.Int()
+    open = fields.Int()
+    updated_at = fields.DateTime()
+
+
+class TaskFilterSchema(BaseSchema):
     page = fields.Int(load_default=1, validate=validate.Range(min=1))
     per_page = fields.Int(load_default=10, validate=validate.Range(min=1, max=100))
     completed = fields.Bool(load_default=None)  # optional filter
     sort_by = fields.Str(
         load_default="id",
-        validate=validate.OneOf(["id", "priority", "created_at", "description"]),
+        validate=validate.OneOf(
+            ["id", "priority", "created_at", "description", "rank"]
+        ),
     )
     sort_order = fields.Str(
         load_default="asc",
         validate=validate.OneOf(["asc", "desc"]),
     )
+    # keyset pagination: pass an empty cursor for the first page, then next_cursor
+    cursor = fields.Str(load_default=None)
+    # skip the COUNT(*) when false; searches skip it unless asked for, since
+    # counting every match costs more than finding the first page
+    include_total = fields.Bool(load_default=True)
+    # projection: comma separated task fields, e.g. fields=description,completed
+    only_fields = fields.Str(data_key="fields", load_default=None)
+    # full-text search over descriptions
+    q = fields.Str(load_default=None, validate=validate.Length(min=1, max=200))
+
+    # a search is ranked best-first unless another sort is asked for, and
+    # left uncounted unless include_total is
+    @pre_load
+    def default_search_sort(self, data, **kwargs):
+        if data.get("q"):
+            data = dict(data.items())
+            data.setdefault("sort_by", "rank")
+            data.setdefault("include_total", "false")
+        return data
+
+    @validates_schema
+    def validate_rank_sort(self, data, **kwargs):
+        if data.get("sort_by") != "rank":
+            return
+        if not data.get("q"):
+            raise ValidationError("Sorting by rank needs a search (q).", "sort_by")
+        if data.get("cursor") is not None:
+            raise ValidationError("Ranked search supports page paging only.", "cursor")
+
+    @validates("only_fields")
+    def validate_only_fields(self, value, **kwargs):
+        if value is None:
+            return
+        unknown = set(value.split(",")) - set(TASK_FIELDS)
+        if unknown:
+            raise ValidationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. "
+                f"Allowed: {', '.join(TASK_FIELDS)}"
+            )
+
+    # id is always returned so links (and cursors) keep working
+    @post_load
+    def split_only_fields(self, data, **kwargs):
+        if data["only_fields"] is not None:
+            requested = set(data["only_fields"].split(",")) | {"id"}
+            data["only_fields"] = tuple(f for f in TASK_FIELDS if f in requested)
+        return data
 
     class Meta:
         unkown = EXCLUDE
 
 
-class UserSchema(Schema):
+class TaskChangesSchema(BaseSchema):
+    since = fields.Str(load_default=None)  # token from the previous response
+    limit = fields.Int(load_default=100, validate=validate.Range(min=1, max=1000))
+
+
+class TaskExportSchema(BaseSchema):
+    format = fields.Str(
+        load_default="ndjson", validate=validate.OneOf(["ndjson", "csv"])
+    )
+    completed = fields.Bool(load_default=None)
+
+
+class UserSchema(BaseSchema):
     id = fields.Int(dump_only=True)
     username = fields.Str(required=True, validate=validate.Length(min=3))
     password = fields.Str(
@@ -0,0 +1,139 @@
+import re
+
+from sqlalchemy import DDL, column, event, func, literal_column, table
+
+from . import db
+from .models import Task
+
+# SQLite: FTS5 index over tasks.description. Every word is indexed with
+# its owner baked in ("u42xbudget"), so a MATCH reads only the searching
+# user's postings instead of every user's. The index is an external-content
+# table over the tasks_fts_source view (no copy of the text), kept in sync
+# by triggers. Descriptions are letters, digits and spaces (see
+# validators.py); words after any other separator, possible only in rows
+# written outside the API, are indexed without an owner and never match.
+def _owned_terms(user_id, description):
+    owner = f"'u' || {user_id} || 'x'"
+    return f"{owner} || replace({description}, ' ', ' ' || {owner})"
+
+
+SQLITE_FTS_DDL = [
+    "CREATE VIEW IF NOT EXISTS tasks_fts_source AS "
+    f"SELECT id, {_owned_terms('user_id', 'description')} AS terms FROM tasks",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "terms, content='tasks_fts_source', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, terms) "
+    f"VALUES (new.id, {_owned_terms('new.user_id', 'new.description')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, terms) "
+    f"VALUES ('delete', old.id, {_owned_terms('old.user_id', 'old.description')}); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au "
+    "AFTER UPDATE OF description, user_id ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, terms) "
+    f"VALUES ('delete', old.id, {_owned_terms('old.user_id', 'old.description')}); "
+    "INSERT INTO tasks_fts(rowid, terms) "
+    f"VALUES (new.id, {_owned_terms('new.user_id', 'new.description')}); "
+    "END",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TABLE IF EXISTS tasks_fts",
+    "DROP VIEW IF EXISTS tasks_fts_source",
+]
+
+# PostgreSQL: a generated tsvector column with a GIN index; user_id is
+# filtered in the same query
+POSTGRES_FTS_DDL = [
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', description)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector "
+    "ON tasks USING gin (search_vector)",
+]
+
+tasks_fts = table("tasks_fts", column("rowid"), column("rank"))
+search_vector = literal_column("tasks.search_vector")
+
+# underscores split words, as they do for the tokenizer
+_TERM = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+# db.create_all() (tests, fresh installs) gets the same index as the
+# migrations; on PostgreSQL the column and index go with the table on drop
+for dialect, statements in (
+    ("sqlite", SQLITE_FTS_DDL),
+    ("postgresql", POSTGRES_FTS_DDL),
+):
+    for statement in statements:
+        event.listen(
+            Task.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect=dialect),
+        )
+for statement in SQLITE_FTS_DROP:
+    event.listen(
+        Task.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+
+# both backends read q the same way: every word must match, as a stemmed
+# prefix, so q=bud finds "budget" on SQLite and PostgreSQL alike
+def fts_query(q: str, user_id) -> str | None:
+    """
+    Turn user input into a safe FTS5 expression over `user_id`'s tasks.
+    Returns None when q has no searchable words.
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        return None
+    return " ".join(f'"u{int(user_id)}x{term}"*' for term in terms)
+
+
+def pg_tsquery(q: str) -> str | None:
+    """
+    The same search as fts_query for PostgreSQL's to_tsquery: "bud:* &
+    plan:*". Words are letters and digits only, so nothing in q can act
+    as tsquery syntax. Returns None when q has no searchable words.
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def apply_search(query, q: str, user_id, rank: bool = False):
+    """
+    Restrict a SELECT of `user_id`'s tasks to full-text matches of q, best
+    first if rank.
+    """
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        terms = pg_tsquery(q)
+        if terms is None:
+            return query.filter(db.false())
+        tsquery = func.to_tsquery("english", terms)
+        query = query.filter(search_vector.op("@@")(tsquery))
+        if rank:
+            query = query.order_by(None).order_by(
+                func.ts_rank(search_vector, tsquery).desc(), Task.id.asc()
+            )
+        return query
+
+    match = fts_query(q, user_id)
+    if match is None:
+        return query.filter(db.false())
+    if not rank:
+        matches = db.select(tasks_fts.c.rowid).where(
+            literal_column("tasks_fts").op("MATCH")(match)
+        )
+        return query.filter(Task.id.in_(matches))
+    return (
+        query.join(tasks_fts, tasks_fts.c.rowid == Task.id)
+        .filter(literal_column("tasks_fts").op("MATCH")(match))
+        .order_by(None)
+        .order_by(tasks_fts.c.rank, Task.id.asc())  # bm25: lower is better
+    )
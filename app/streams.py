@@ -0,0 +1,208 @@
+import json
+import queue
+import secrets
+import threading
+from collections import deque
+from typing import NamedTuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+PENDING_EVENTS_KEY = "pending_stream_events"
+
+
+class StreamEvent(NamedTuple):
+    seq: int  # broker-wide sequence number, sent in the SSE id
+    type: str
+    data: dict
+
+
+class Subscription:
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False  # too slow to keep up; must resync
+
+
+class _Channel:
+    """A user's subscribers and recent events, kept while anyone listens."""
+
+    def __init__(self, floor, history):
+        self.subscribers = set()
+        self.recent = deque(maxlen=history)
+        # every event after seq `floor` is in recent
+        self.floor = floor
+
+
+class InProcessBroker:
+    """
+    Fans task events out to the SSE subscribers of this process.
+
+    A user's state lives only while they have a subscriber: publishing to
+    a user nobody is listening for is a no-op, and the last unsubscribe
+    drops their history. Of the events published while someone listens,
+    the last `history` are kept so a reconnecting client can resume from
+    Last-Event-ID.
+
+    Event ids are "<stream>-<seq>", where stream is random per broker: an
+    id from another worker process, or from before a restart, gets a
+    reset instead of a wrong resume. A shared broker (e.g. Redis pub/sub)
+    would implement the same publish/subscribe/unsubscribe.
+    """
+
+    def __init__(self, history=100, queue_size=100):
+        self.history = history
+        self.queue_size = queue_size
+        self.stream_id = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._seq = 0  # last sequence number, across all users
+        self._channels = {}  # user_id -> _Channel
+
+    def has_subscribers(self, user_id) -> bool:
+        return user_id in self._channels
+
+    def publish(self, user_id, event_type, data):
+        """Returns the event's sequence number, or None if nobody listens."""
+        with self._lock:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                return None
+            self._seq += 1
+            stream_event = StreamEvent(self._seq, event_type, data)
+            if len(channel.recent) == self.history:
+                channel.floor = channel.recent[0].seq
+            channel.recent.append(stream_event)
+            subscribers = list(channel.subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(stream_event)
+            except queue.Full:
+                subscription.overflowed = True
+        return stream_event.seq
+
+    def subscribe(self, user_id, last_event_id=None):
+        """
+        Returns (subscription, backlog). backlog holds the events after
+        last_event_id (as returned by parse_event_id), or is None when they
+        are no longer all available and the client has to reload instead.
+        """
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                # nothing was kept for this user: no id seen so far resumes
+                channel = self._channels[user_id] = _Channel(
+                    self._seq + 1, self.history
+                )
+            channel.subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription, []
+            stream_id, seq = last_event_id
+            if stream_id != self.stream_id or not channel.floor <= seq <= self._seq:
+                return subscription, None
+            return subscription, [e for e in channel.recent if e.seq > seq]
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            channel = self._channels.get(subscription.user_id)
+            if channel is not None:
+                channel.subscribers.discard(subscription)
+                if not channel.subscribers:
+                    del self._channels[subscription.user_id]
+
+    def event_id(self, seq) -> str:
+        return f"{self.stream_id}-{seq}"
+
+    @staticmethod
+    def parse_event_id(value):
+        """(stream_id, seq) from an event id; ValueError if malformed."""
+        stream_id, _, seq = value.rpartition("-")
+        if not stream_id:
+            raise ValueError(value)
+        return stream_id, int(seq)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "subscribers": sum(
+                    len(c.subscribers) for c in self._channels.values()
+                ),
+                "users": len(self._channels),
+            }
+
+
+def make_task_stream(config):
+    backend = config["TASK_STREAM"]
+    if backend == "memory":
+        return InProcessBroker(
+            config["TASK_STREAM_HISTORY"], config["TASK_STREAM_QUEUE_SIZE"]
+        )
+    if backend in (None, "", "none"):
+        return None
+    raise ValueError("TASK_STREAM must be 'none' or 'memory'")
+
+
+def task_stream():
+    return current_app.extensions.get("task_stream")
+
+
+def sse_events(broker, subscription, backlog, heartbeat):
+    """
+    Generate the SSE body: the backlog, then live events, with a comment
+    line every `heartbeat` seconds so proxies keep the connection open.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        if backlog is None:
+            yield _format("reset", {"reason": "missed events, reload tasks"})
+            backlog = []
+        for stream_event in backlog:
+            yield _format(
+                stream_event.type, stream_event.data, broker.event_id(stream_event.seq)
+            )
+        while True:
+            try:
+                stream_event = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            if subscription.overflowed:
+                yield _format("reset", {"reason": "too far behind, reload tasks"})
+                return
+            yield _format(
+                stream_event.type, stream_event.data, broker.event_id(stream_event.seq)
+            )
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _format(event_type, data, event_id=None) -> str:
+    lines = [f"event: {event_type}", f"data: {json.dumps(data)}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
+
+
+def queue_stream_events(session, events):
+    """Publish (user_id, type, data) events once this transaction commits."""
+    session.info.setdefault(PENDING_EVENTS_KEY, []).extend(events)
+
+
+# publish only after commit, so subscribers never see a change that was
+# rolled back
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    events = session.info.pop(PENDING_EVENTS_KEY, None)
+    if not events or not has_app_context():
+        return
+    broker = task_stream()
+    if broker is not None:
+        for user_id, event_type, data in events:
+            broker.publish(user_id, event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
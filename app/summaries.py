@@ -0,0 +1,133 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+
+from datetime import datetime
+
+from . import db
+from .cache import mark_listings_stale
+from .models import Task, TaskSummary, User, utc_now
+
+# stamp of a summary computed for a user who has no tasks yet
+NEVER = datetime(1970, 1, 1)
+
+
+def apply_delta(user_id, total=0, completed=0):
+    """
+    Adjust a user's summary in the current transaction.
+
+    Counters move with an atomic UPDATE ... SET total = total + :n; a user
+    without a summary row gets one computed from the tasks table instead.
+    """
+    user_id = int(user_id)
+    table = TaskSummary.__table__
+    result = db.session.execute(
+        table.update()
+        .where(table.c.user_id == user_id)
+        .values(
+            total=table.c.total + total,
+            completed=table.c.completed + completed,
+            updated_at=utc_now(),
+            version=table.c.version + 1,
+        )
+    )
+    if result.rowcount == 0:
+        _recompute_summary(user_id)
+    mark_listings_stale(db.session, user_id)
+
+
+def refresh_summary(user_id) -> TaskSummary:
+    """Recompute a user's summary from the tasks table after a bulk change."""
+    summary = _recompute_summary(user_id)
+    mark_listings_stale(db.session, user_id)
+    return summary
+
+
+def _recompute_summary(user_id) -> TaskSummary:
+    user_id = int(user_id)
+    db.session.flush()
+    total, completed, _, now = db.session.execute(
+        _counts_query(user_id).add_columns(utc_now())
+    ).one()
+
+    summary = db.session.get(TaskSummary, user_id, populate_existing=True)
+    if summary is None:
+        summary = _insert_summary(user_id)
+    summary.total = total
+    summary.completed = completed
+    # the database clock, like apply_delta: a rebuild after deletes must
+    # still move the listing ETags
+    summary.updated_at = now
+    summary.version = TaskSummary.version + 1
+    db.session.flush()
+    return summary
+
+
+def _counts_query(user_id):
+    return db.select(
+        db.func.count(Task.id),
+        db.func.coalesce(db.func.sum(case((Task.completed, 1), else_=0)), 0),
+        db.func.max(Task.updated_at),
+    ).filter(Task.user_id == user_id)
+
+
+def _insert_summary(user_id) -> TaskSummary:
+    try:
+        with db.session.begin_nested():
+            summary = TaskSummary(user_id=user_id, total=0, completed=0)
+            db.session.add(summary)
+        return summary
+    except IntegrityError:
+        # a concurrent request created it first
+        return db.session.get(TaskSummary, user_id, populate_existing=True)
+
+
+def get_summary(user_id) -> TaskSummary:
+    """
+    The user's summary. A user without one (created before summaries, or
+    outside the API) gets counts computed on the fly; reads never write,
+    so the row itself is created by the user's next task write.
+    """
+    user_id = int(user_id)
+    summary = db.session.get(TaskSummary, user_id, populate_existing=True)
+    if summary is None:
+        total, completed, last_updated = db.session.execute(
+            _counts_query(user_id)
+        ).one()
+        summary = TaskSummary(
+            user_id=user_id,
+            total=total,
+            completed=completed,
+            updated_at=last_updated or NEVER,
+            version=0,
+        )
+    return summary
+
+
+def summary_count(summary, completed=None) -> int:
+    """Row count for a listing filtered on `completed` (None = all tasks)."""
+    if completed is None:
+        return summary.total
+    return summary.completed if completed else summary.open
+
+
+def repair_summaries() -> int:
+    """Rebuild every user's summary; returns how many were wrong or missing."""
+    repaired = 0
+    for user_id in db.session.scalars(db.select(User.id)):
+        before = db.session.get(TaskSummary, user_id)
+        before = before and (before.total, before.completed)
+        after = refresh_summary(user_id)
+        if before != (after.total, after.completed):
+            repaired += 1
+    db.session.commit()
+    return repaired
+
+
+@click.command("repair-task-summaries")
+@with_appcontext
+def repair_summaries_command():
+    """Recompute every user's task summary from the tasks table."""
+    repaired = repair_summaries()
+    click.echo(f"Repaired {repaired} task summaries")
@@ -0,0 +1,159 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+import click
+from flask import abort, current_app
+from flask.cli import with_appcontext
+from marshmallow import ValidationError
+from sqlalchemy import tuple_
+
+from . import db
+from .models import Task, TaskTombstone, utcnow
+
+
+# sync tokens: base64url(json) of the last (updated_at, id) task key and
+# the last (deleted_at, id) tombstone key the client has seen
+def encode_token(task_key, tombstone_key) -> str:
+    payload = {"t": _key_json(task_key), "d": _key_json(tombstone_key)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_token(token: str):
+    """Return the (task_key, tombstone_key) stored in a sync token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _key(payload["t"]), _key(payload["d"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValidationError({"since": ["Invalid sync token."]})
+
+
+def _key_json(key):
+    if key is None:
+        return None
+    timestamp, row_id = key
+    return [timestamp.isoformat(), row_id]
+
+
+def _key(value):
+    if value is None:
+        return None
+    timestamp, row_id = value
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def tombstone_deleted_tasks(user_id, task_ids):
+    """Record deletes in the current transaction (see /tasks/changes)."""
+    if not task_ids:
+        return
+    user_id = int(user_id)
+    db.session.execute(
+        db.insert(TaskTombstone),
+        [{"task_id": task_id, "user_id": user_id} for task_id in sorted(task_ids)],
+    )
+
+
+def changes_since(user_id, since, limit):
+    """
+    One batch of a user's changes after the `since` token: at most `limit`
+    changed tasks and `limit` deleted ids, walked along the
+    (user_id, updated_at, id) and (user_id, deleted_at, id) indexes.
+
+    Timestamps are taken before commit, so a transaction still in flight
+    can commit a change stamped slightly earlier than one already seen.
+    The returned token therefore never moves past now - SYNC_SAFETY_WINDOW;
+    changes inside that window are sent again on the next sync (clients
+    apply them idempotently) instead of being missed.
+    """
+    user_id = int(user_id)
+    window = current_app.config["SYNC_SAFETY_WINDOW_MS"]
+    horizon = utcnow() - timedelta(milliseconds=window)
+
+    if since is None:
+        # full download: every task, and deletes from now on
+        task_key, tombstone_key = None, (horizon, 0)
+    else:
+        task_key, tombstone_key = decode_token(since)
+        retention = timedelta(
+            days=current_app.config["SYNC_TOMBSTONE_RETENTION_DAYS"]
+        )
+        if tombstone_key[0] < horizon - retention:
+            abort(410, description="Sync token expired, start a full sync")
+
+    tasks, tasks_more, task_key = _batch(
+        task_changes_query(user_id, task_key, limit),
+        (Task.updated_at, Task.id),
+        task_key,
+        limit,
+        horizon,
+    )
+    tombstones, tombstones_more, tombstone_key = _batch(
+        tombstones_query(user_id, tombstone_key, limit),
+        (TaskTombstone.deleted_at, TaskTombstone.id),
+        tombstone_key,
+        limit,
+        horizon,
+    )
+    return {
+        "tasks": tasks,
+        "deleted": [tombstone.task_id for tombstone in tombstones],
+        "next": encode_token(task_key, tombstone_key),
+        "has_more": tasks_more or tombstones_more,
+    }
+
+
+def task_changes_query(user_id, since_key, limit):
+    """The user's tasks after (updated_at, id), one more than a batch."""
+    query = db.select(Task).filter(Task.user_id == user_id)
+    return _after(query, Task.updated_at, Task.id, since_key, limit)
+
+
+def tombstones_query(user_id, since_key, limit):
+    """The user's tombstones after (deleted_at, id), one more than a batch."""
+    query = db.select(TaskTombstone).filter(TaskTombstone.user_id == user_id)
+    return _after(
+        query, TaskTombstone.deleted_at, TaskTombstone.id, since_key, limit
+    )
+
+
+def _after(query, timestamp_column, id_column, since_key, limit):
+    if since_key is not None:
+        query = query.filter(tuple_(timestamp_column, id_column) > tuple_(*since_key))
+    return query.order_by(timestamp_column, id_column).limit(limit + 1)
+
+
+def _batch(query, key_columns, since_key, limit, horizon):
+    rows = db.session.scalars(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more:
+        last = rows[-1]
+        key = tuple(getattr(last, column.key) for column in key_columns)
+        if key[0] <= horizon:
+            return rows, True, key
+    # caught up (or into the safety window): everything up to the horizon
+    # has been seen; never move a client back from where it already was
+    key = (horizon, 0) if since_key is None else max((horizon, 0), since_key)
+    return rows, False, key
+
+
+def prune_tombstones() -> int:
+    cutoff = utcnow() - timedelta(
+        days=current_app.config["SYNC_TOMBSTONE_RETENTION_DAYS"]
+    )
+    result = db.session.execute(
+        db.delete(TaskTombstone).where(TaskTombstone.deleted_at < cutoff)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+@click.command("prune-task-tombstones")
+@with_appcontext
+def prune_tombstones_command():
+    """Delete tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS."""
+    click.echo(f"Pruned {prune_tombstones()} tombstone(s).")
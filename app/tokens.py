@@ -0,0 +1,167 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+from .profiling import timed
+
+_NOT_REVOKED = object()
+
+
+class ClaimsCache:
+    """
+    LRU of verified token claims, keyed by a hash of the encoded token.
+
+    An entry lives for `ttl` seconds but never past the token's own `exp`;
+    after that the token goes through full verification again, so expiry
+    errors are still raised by flask_jwt_extended.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, token, claims):
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        key = _token_key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def metrics(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips signature checks for tokens it has verified before."""
+
+    def _decode_jwt_from_config(
+        self, encoded_token, csrf_value=None, allow_expired=False
+    ):
+        with timed("jwt"):
+            cache = current_app.extensions.get("jwt_claims_cache")
+            # CSRF checks and expired-token decodes are rare: leave them uncached
+            if cache is None or csrf_value is not None or allow_expired:
+                return super()._decode_jwt_from_config(
+                    encoded_token, csrf_value, allow_expired
+                )
+            claims = cache.get(encoded_token)
+            if claims is None:
+                claims = super()._decode_jwt_from_config(encoded_token)
+                cache.set(encoded_token, claims)
+            return claims
+
+
+class RevocationList:
+    """
+    Revoked token ids held in a set for O(1) checks.
+
+    Entries are dropped once the token would have expired anyway, so the
+    set only ever holds tokens that are still otherwise valid. Tokens with
+    no expiry (expires_at None) stay revoked for the life of the process.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti) -> bool:
+        expires_at = self._revoked.get(jti, _NOT_REVOKED)
+        if expires_at is _NOT_REVOKED:
+            return False
+        if expires_at is not None and expires_at <= time.time():
+            with self._lock:
+                self._revoked.pop(jti, None)
+            return False
+        return True
+
+
+class SharedRevocationList:
+    """
+    Revoked token ids on a shared key/value store, so a logout is seen by
+    every worker. `client` needs redis-style get(key) and set(key, value, ex=ttl).
+    """
+
+    def __init__(self, client, prefix="tokens:revoked:"):
+        self.client = client
+        self.prefix = prefix
+
+    def revoke(self, jti, expires_at):
+        ttl = None
+        if expires_at is not None:
+            ttl = max(int(expires_at - time.time()) + 1, 1)
+        self.client.set(self.prefix + jti, b"1", ex=ttl)
+
+    def is_revoked(self, jti) -> bool:
+        return self.client.get(self.prefix + jti) is not None
+
+
+def make_revocation_list(config):
+    backend = config["JWT_REVOCATION"]
+    if backend == "memory":
+        return RevocationList()
+    if backend == "shared":
+        client = config["JWT_REVOCATION_CLIENT"]
+        if client is None:
+            raise RuntimeError("JWT_REVOCATION='shared' needs a JWT_REVOCATION_CLIENT")
+        return SharedRevocationList(client)
+    raise ValueError("JWT_REVOCATION must be 'memory' or 'shared'")
+
+
+def init_tokens(app):
+    """Set up the JWT manager, claims cache and revocation list on the app."""
+    jwt = CachingJWTManager(app)
+
+    if app.config["JWT_CLAIMS_CACHE_SIZE"] > 0:
+        app.extensions["jwt_claims_cache"] = ClaimsCache(
+            app.config["JWT_CLAIMS_CACHE_SIZE"], app.config["JWT_CLAIMS_CACHE_TTL"]
+        )
+    app.extensions["jwt_revocations"] = make_revocation_list(app.config)
+
+    @jwt.token_in_blocklist_loader
+    def token_is_revoked(jwt_header, jwt_payload):
+        return revocation_list().is_revoked(jwt_payload["jti"])
+
+    return jwt
+
+
+def revocation_list():
+    return current_app.extensions["jwt_revocations"]
+
+
+def revoke_token(claims):
+    """Revoke a decoded token until it expires (logout)."""
+    revocation_list().revoke(claims["jti"], claims.get("exp"))
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
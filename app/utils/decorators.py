@@ -1,35 +1,26 @@
 from functools import wraps
 from flask import abort
-from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+from .policy import current_principal
 
 
 # RBAC access control
-def role_required(*roles):
+def permission_required(permission):
     """
-    Decorator to restrict access based on user role(s).
+    Decorator to restrict access to roles granting a permission.
+    Verifies the token itself, so don't stack it with @jwt_required().
     Example:
-        @role_required("admin")
+        @permission_required("admin:read")
         def admin_route(): ...
-
-        @role_required("admin", "manager")
-        def multi_role_route(): ...
     """
 
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
-            user_role = claims.get("role")
-
-            if user_role not in roles:
+            if not current_principal().has(permission):
                 abort(403, description="Forbidden: insufficient role")
             return fn(*args, **kwargs)
 
         return decorator
 
     return wrapper
-
-
-def admin_required():
-    return role_required("admin")
@@ -0,0 +1,38 @@
+import hashlib
+
+from flask import current_app, request, abort
+
+from ..summaries import summary_count
+
+
+# strong validators built from cheap columns, so a 304 never needs a dump
+def task_etag(task) -> str:
+    return _digest(f"task:{task.id}:{task.updated_at.isoformat()}")
+
+
+def listing_etag(summary, filters) -> str:
+    """Listing validator from the user's task summary (one primary-key read)."""
+    count = summary_count(summary, filters.get("completed"))
+    params = sorted(filters.items())
+    return _digest(
+        f"tasks:{summary.user_id}:{summary.version}:{count}:{params}"
+    )
+
+
+def not_modified(etag):
+    """Return an empty 304 response if the client already has this version."""
+    if not request.if_none_match.contains(etag):
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def require_match(etag):
+    """412 when If-Match is sent and does not match the current version."""
+    if request.if_match and not request.if_match.contains(etag):
+        abort(412, description="Task has been modified")
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()
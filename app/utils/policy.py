@@ -0,0 +1,81 @@
+from typing import NamedTuple
+
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+# role -> permissions it grants; tokens without a role claim (issued before
+# roles existed) or with a role not listed here get DEFAULT_ROLE's
+DEFAULT_ROLE = "user"
+ROLE_PERMISSIONS = {
+    "user": {"tasks:own"},
+    "manager": {"tasks:own", "reports:read"},
+    "admin": {
+        "tasks:own",
+        "tasks:delete_any",
+        "reports:read",
+        "admin:read",
+    },
+}
+
+# resolved once at import, so a check is a frozenset lookup
+_PERMISSIONS = {role: frozenset(perms) for role, perms in ROLE_PERMISSIONS.items()}
+_DEFAULT_PERMISSIONS = _PERMISSIONS[DEFAULT_ROLE]
+
+
+class Principal(NamedTuple):
+    user_id: int
+    role: str | None
+    permissions: frozenset
+
+    def has(self, permission) -> bool:
+        return permission in self.permissions
+
+
+def current_principal() -> Principal:
+    """
+    The caller's identity and permissions, decoded from the token once per
+    request and kept on g.
+    """
+    principal = g.get("principal")
+    if principal is None:
+        verify_jwt_in_request()
+        role = get_jwt().get("role") or DEFAULT_ROLE
+        principal = Principal(
+            int(get_jwt_identity()),
+            role,
+            _PERMISSIONS.get(role, _DEFAULT_PERMISSIONS),
+        )
+        g.principal = principal
+    return principal
+
+
+def reset_principal(exc=None):
+    # the app context (and g) can outlive a request, e.g. in tests. Dropped
+    # on teardown, not in before_request, so a principal resolved by an
+    # earlier hook (the profiler's admin check) serves the whole request
+    g.pop("principal", None)
+
+
+# per-resource rules: may this principal do <permission> on this resource?
+def _can_read_task(principal, task) -> bool:
+    # owners only, as before the policy layer; a rule for managers reading
+    # their team's tasks needs a team model first
+    return task.user_id == principal.user_id
+
+
+RESOURCE_RULES = {
+    "tasks:read": _can_read_task,
+}
+
+
+def can(permission, resource=None) -> bool:
+    """Check a permission, applying its per-resource rule when there is one."""
+    principal = current_principal()
+    rule = RESOURCE_RULES.get(permission)
+    if rule is not None and resource is not None:
+        return rule(principal, resource)
+    return principal.has(permission)
+
+
+def init_policy(app):
+    app.teardown_request(reset_principal)
@@ -0,0 +1,95 @@
+import re
+
+from flask import current_app, has_app_context
+from marshmallow import ValidationError, validate
+
+ALLOWED_CHARACTERS = "a-zA-Z0-9 "
+
+
+def forbidden_words_pattern(words):
+    """
+    One regex matching any of `words` anywhere in a lowercased string.
+
+    The words are merged into a prefix trie first, so the pattern is a
+    nested alternation that the regex engine walks one character at a time:
+    the cost of a search grows with the length of the text, and only with
+    the branching of the trie rather than the number of words. Search
+    lowercased text rather than compiling with IGNORECASE, which turns off
+    the engine's first-character scan and is several times slower.
+    Returns None for an empty list.
+    """
+    trie = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # a word ends here
+    return re.compile(_trie_regex(trie)) if trie else None
+
+
+def _trie_regex(node) -> str:
+    if "" in node:
+        # a shorter word already matches, longer ones add nothing
+        return ""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in node.items()]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class DescriptionValidator(validate.Validator):
+    """
+    Length, allowed characters and forbidden words of a task description,
+    checked in one call.
+
+    A valid description costs two precompiled regex calls. The forbidden
+    words come from the FORBIDDEN_WORDS config key (falling back to
+    `default_words`); their pattern is compiled once and rebuilt only when
+    a new list is assigned to the config.
+    """
+
+    def __init__(self, min, max, default_words=()):
+        self.min = min
+        self.max = max
+        self.default_words = default_words
+        self.shape = re.compile(f"[{ALLOWED_CHARACTERS}]{{{min},{max}}}")
+        self.allowed = re.compile(f"[{ALLOWED_CHARACTERS}]+")
+        self._compiled = {}  # id(words) -> (words, pattern)
+
+    def __call__(self, value):
+        if not self.shape.fullmatch(value):
+            errors = []
+            if not self.min <= len(value) <= self.max:
+                errors.append(
+                    validate.Length.message_all.format(min=self.min, max=self.max)
+                )
+            if not self.allowed.fullmatch(value):
+                errors.append("No special characters allowed")
+            raise ValidationError(errors)
+
+        pattern = self.forbidden_pattern()
+        match = pattern.search(value.lower()) if pattern is not None else None
+        if match:
+            raise ValidationError(
+                f"Task description can not contain: {match.group(0)}"
+            )
+        return value
+
+    def forbidden_pattern(self):
+        words = None
+        if has_app_context():
+            words = current_app.config.get("FORBIDDEN_WORDS")
+        if words is None:
+            words = self.default_words
+        entry = self._compiled.get(id(words))
+        if entry is None or entry[0] is not words:
+            # keep a reference to the list so its id can't be reused
+            entry = (words, forbidden_words_pattern(words))
+            self._compiled = {id(words): entry}
+        return entry[1]
+
+    def _repr_args(self) -> str:
+        return f"min={self.min!r}, max={self.max!r}"
@@ -0,0 +1,253 @@
+import hashlib
+import hmac
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import NamedTuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from . import db
+from .models import TaskEvent, WebhookCursor, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint(NamedTuple):
+    url: str
+    secret: str
+
+
+def configured_endpoints(config) -> list[Endpoint]:
+    """WEBHOOK_ENDPOINTS entries are URLs or {"url", "secret"} dicts."""
+    endpoints = []
+    for entry in config["WEBHOOK_ENDPOINTS"]:
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        endpoints.append(
+            Endpoint(entry["url"], entry.get("secret") or config["WEBHOOK_SECRET"])
+        )
+    return endpoints
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """HMAC-SHA256 over "<timestamp>.<body>", sent as X-Webhook-Signature."""
+    message = timestamp.encode() + b"." + body
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def post_json(url, body, headers, timeout):
+    """Default transport: raise unless the endpoint answers 2xx."""
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        if not 200 <= response.status < 300:
+            raise urllib.error.HTTPError(
+                url, response.status, "webhook rejected", response.headers, None
+            )
+
+
+class WebhookDispatcher:
+    """
+    Delivers task_events to every endpoint in order, in signed batches.
+
+    Each endpoint keeps a cursor (last delivered event id) in
+    webhook_cursors and has at most one batch in flight, which keeps its
+    events ordered; endpoints are delivered to in parallel on a thread
+    pool. A failed batch is retried with capped exponential backoff, so
+    delivery is at-least-once: receivers should de-duplicate on event id.
+
+    Event ids are taken before commit, so a slower transaction can commit
+    a lower id after a higher one was already read. A batch therefore
+    stops at the first event younger than safety_window_ms and the cursor
+    never passes it; only a transaction that takes longer than the window
+    to commit can still have its events skipped (as with /tasks/changes).
+    """
+
+    def __init__(
+        self,
+        app,
+        endpoints,
+        batch_size=100,
+        workers=4,
+        timeout=5,
+        backoff_base=1.0,
+        backoff_max=300.0,
+        safety_window_ms=1000,
+        transport=post_json,
+    ):
+        self.app = app
+        self.endpoints = list(endpoints)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.safety_window = timedelta(milliseconds=safety_window_ms)
+        self.transport = transport
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="webhooks"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._failures = {}  # url -> consecutive failed attempts
+        self._next_attempt = {}  # url -> monotonic time of the next retry
+
+    @classmethod
+    def from_config(cls, app):
+        config = app.config
+        return cls(
+            app,
+            configured_endpoints(config),
+            batch_size=config["WEBHOOK_BATCH_SIZE"],
+            workers=config["WEBHOOK_WORKERS"],
+            timeout=config["WEBHOOK_TIMEOUT"],
+            backoff_max=config["WEBHOOK_BACKOFF_MAX"],
+            safety_window_ms=config["WEBHOOK_SAFETY_WINDOW_MS"],
+        )
+
+    def run_once(self) -> int:
+        """Send one batch to every endpoint that is due; returns events sent."""
+        futures = [
+            self._executor.submit(self._deliver, endpoint)
+            for endpoint in self._due_endpoints()
+        ]
+        delivered = sum(future.result() for future in futures)
+        # every pass: cursors can also move in another dispatcher process
+        with self.app.app_context():
+            self.prune()
+        return delivered
+
+    def run_forever(self, interval=1.0, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            # keep draining while there is a backlog, otherwise poll
+            if not self.run_once():
+                stop.wait(interval)
+
+    def prune(self):
+        """Drop events every configured endpoint has received."""
+        urls = [endpoint.url for endpoint in self.endpoints]
+        cursors = db.session.scalars(
+            db.select(WebhookCursor.last_event_id).filter(
+                WebhookCursor.endpoint.in_(urls)
+            )
+        ).all()
+        if len(cursors) < len(urls):
+            return
+        db.session.execute(db.delete(TaskEvent).where(TaskEvent.id <= min(cursors)))
+        db.session.commit()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _due_endpoints(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                endpoint
+                for endpoint in self.endpoints
+                if endpoint.url not in self._in_flight
+                and self._next_attempt.get(endpoint.url, 0) <= now
+            ]
+            self._in_flight.update(endpoint.url for endpoint in due)
+        return due
+
+    def _deliver(self, endpoint) -> int:
+        try:
+            with self.app.app_context():
+                return self._deliver_batch(endpoint)
+        finally:
+            with self._lock:
+                self._in_flight.discard(endpoint.url)
+
+    def _deliver_batch(self, endpoint) -> int:
+        cursor = db.session.get(WebhookCursor, endpoint.url)
+        if cursor is None:
+            cursor = WebhookCursor(endpoint=endpoint.url, last_event_id=0)
+            db.session.add(cursor)
+        horizon = utcnow() - self.safety_window
+        events = []
+        for event in db.session.scalars(
+            db.select(TaskEvent)
+            .filter(TaskEvent.id > cursor.last_event_id)
+            .order_by(TaskEvent.id)
+            .limit(self.batch_size)
+        ):
+            # a lower id may still be committing behind this one
+            if event.created_at > horizon:
+                break
+            events.append(event)
+        if not events:
+            db.session.rollback()
+            return 0
+
+        body = json.dumps(
+            {"events": [_event_json(event) for event in events]}, separators=(",", ":")
+        ).encode()
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Timestamp": timestamp,
+            "X-Webhook-Signature": sign(endpoint.secret, timestamp, body),
+        }
+        try:
+            self.transport(endpoint.url, body, headers, self.timeout)
+        except Exception as exc:
+            db.session.rollback()
+            delay = self._backoff(endpoint.url)
+            logger.warning(
+                "webhook %s failed (%s); retrying in %.1fs", endpoint.url, exc, delay
+            )
+            return 0
+
+        cursor.last_event_id = events[-1].id
+        db.session.commit()
+        with self._lock:
+            self._failures.pop(endpoint.url, None)
+            self._next_attempt.pop(endpoint.url, None)
+        return len(events)
+
+    def _backoff(self, url) -> float:
+        with self._lock:
+            failures = self._failures.get(url, 0) + 1
+            self._failures[url] = failures
+            delay = min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
+            delay *= random.uniform(0.5, 1.0)  # jitter, so endpoints don't sync up
+            self._next_attempt[url] = time.monotonic() + delay
+        return delay
+
+
+def _event_json(event) -> dict:
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "created_at": event.created_at.isoformat(),
+        "data": event.payload,
+    }
+
+
+@click.command("dispatch-webhooks")
+@click.option("--once", is_flag=True, help="Send one round of batches and exit.")
+@click.option("--interval", default=1.0, help="Seconds between polls when idle.")
+@with_appcontext
+def dispatch_webhooks_command(once, interval):
+    """Deliver queued task events to the configured webhook endpoints."""
+    app = current_app._get_current_object()
+    dispatcher = WebhookDispatcher.from_config(app)
+    if not dispatcher.endpoints:
+        raise click.ClickException("No WEBHOOK_ENDPOINTS configured.")
+    try:
+        if once:
+            click.echo(f"Delivered {dispatcher.run_once()} event(s).")
+        else:
+            dispatcher.run_forever(interval)
+    finally:
+        dispatcher.shutdown()
@@ -0,0 +1,94 @@
+"""
+Per-request auth overhead on an admin-only route: the old stacked
+@admin_required() + @jwt_required() decorators against the policy layer,
+with and without the verified-claims cache.
+
+Run from the project root:
+    python -m benchmarks.bench_auth [--requests 5000]
+"""
+import argparse
+import time
+from functools import wraps
+
+from flask import abort
+from flask_jwt_extended import (
+    create_access_token,
+    get_jwt,
+    jwt_required,
+    verify_jwt_in_request,
+)
+
+from app import create_app
+from app.config import TestConfig
+from app.utils.decorators import permission_required
+
+
+# role_required as it was: verifies the token again on top of @jwt_required()
+def legacy_admin_required(fn):
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        verify_jwt_in_request()
+        if get_jwt().get("role") != "admin":
+            abort(403, description="Forbidden: insufficient role")
+        return fn(*args, **kwargs)
+
+    return decorator
+
+
+def make_app(claims_cache):
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": TestConfig.SQLALCHEMY_DATABASE_URI,
+        "JWT_CLAIMS_CACHE_SIZE": 1024 if claims_cache else 0,
+    }
+    app = create_app(config)
+
+    @app.get("/bench/legacy")
+    @legacy_admin_required
+    @jwt_required()
+    def legacy():
+        return {}
+
+    @app.get("/bench/policy")
+    @permission_required("admin:read")
+    def policy():
+        return {}
+
+    @app.get("/bench/none")
+    def no_auth():
+        return {}
+
+    return app
+
+
+def per_request_us(client, url, headers, n):
+    client.get(url, headers=headers)  # warm up
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(url, headers=headers)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    for claims_cache in (False, True):
+        app = make_app(claims_cache)
+        with app.app_context():
+            token = create_access_token("1", additional_claims={"role": "admin"})
+        headers = {"Authorization": f"Bearer {token}"}
+        client = app.test_client()
+
+        baseline = per_request_us(client, "/bench/none", {}, args.requests)
+        for name in ("legacy", "policy"):
+            total = per_request_us(client, f"/bench/{name}", headers, args.requests)
+            print(
+                f"claims_cache={str(claims_cache):5} {name:6} "
+                f"auth overhead={total - baseline:7.1f} us/request"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Import throughput: POST /tasks/import (NDJSON and CSV) in rows per second,
+against creating the same tasks one POST /tasks at a time.
+
+Run from the project root:
+    python -m benchmarks.bench_import [--rows 50000] [--batch-size 1000]
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import TestConfig
+from app.models import Task, User
+
+WORDS = (
+    "buy call email fix plan review write clean book pay send order update "
+    "garden report invoice meeting budget design deploy test release draft"
+).split()
+
+
+def records(n_rows, rng):
+    return [
+        {
+            "description": " ".join(rng.choices(WORDS, k=4)),
+            "completed": rng.random() < 0.3,
+            "priority": rng.randint(1, 5),
+        }
+        for _ in range(n_rows)
+    ]
+
+
+def ndjson_body(rows) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def csv_body(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def report(label, n_rows, seconds):
+    print(f"{label:22} rows={n_rows:7} {seconds:7.2f} s {n_rows / seconds:9.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--single-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    app.config["IMPORT_BATCH_SIZE"] = args.batch_size
+    rng = random.Random(7)
+    rows = records(args.rows, rng)
+    with app.app_context():
+        db.create_all()
+        user = User(username="importer")
+        user.set_password("secret123")
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+    client = app.test_client()
+    for label, content_type, body in [
+        ("import ndjson", "application/x-ndjson", ndjson_body(rows)),
+        ("import csv", "text/csv", csv_body(rows)),
+    ]:
+        start = time.perf_counter()
+        res = client.post(
+            "/tasks/import",
+            input_stream=io.BytesIO(body),
+            content_type=content_type,
+            content_length=len(body),
+            headers=headers,
+        )
+        elapsed = time.perf_counter() - start
+        assert res.get_json()["imported"] == args.rows, res.get_json()
+        report(label, args.rows, elapsed)
+
+    single = rows[: args.single_rows]
+    start = time.perf_counter()
+    for row in single:
+        client.post("/tasks", json=row, headers=headers)
+    report("POST /tasks per row", len(single), time.perf_counter() - start)
+
+    with app.app_context():
+        expected = 2 * args.rows + len(single)
+        assert db.session.scalar(db.select(db.func.count(Task.id))) == expected
+
+
+if __name__ == "__main__":
+    main()
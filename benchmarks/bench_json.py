@@ -0,0 +1,62 @@
+"""
+Compare the stdlib and orjson JSON providers on a 100-item task page.
+
+Run from the project root:
+    python -m benchmarks.bench_json
+"""
+import timeit
+from datetime import datetime, timezone
+
+from app import create_app
+from app.json_provider import FastJSONProvider, orjson
+from app.models import Task
+from app.serializers import native_task_serializer, task_serializer
+
+ROUNDS = 500
+
+
+def task_page(n=100):
+    now = datetime.now(timezone.utc)
+    return [
+        Task(
+            id=i,
+            description=f"Task {i}",
+            completed=i % 3 == 0,
+            priority=i % 5,
+            created_at=now,
+            updated_at=now,
+            user_id=1,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def main():
+    app = create_app()
+    tasks = task_page()
+    encoders = ["stdlib"] + (["orjson"] if orjson else [])
+
+    with app.app_context():
+        for encoder in encoders:
+            provider = FastJSONProvider(app, encoder=encoder)
+            serializer = (
+                native_task_serializer if encoder == "orjson" else task_serializer
+            )
+            meta = {"page": 1, "per_page": 100}
+            page = {"meta": meta, "items": serializer.dump_many(tasks)}
+
+            encode = timeit.timeit(lambda: provider.response(page), number=ROUNDS)
+            end_to_end = timeit.timeit(
+                lambda: provider.response(
+                    {"meta": meta, "items": serializer.dump_many(tasks)}
+                ),
+                number=ROUNDS,
+            )
+            print(
+                f"{encoder:>7}: encode {encode / ROUNDS * 1e3:.3f} ms/page, "
+                f"dump+encode {end_to_end / ROUNDS * 1e3:.3f} ms/page"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Load test: seed N users and M tasks, then drive a fixed mix of API calls
+through the WSGI app from C concurrent clients, and report p50/p95/p99
+latency and requests per second per endpoint.
+
+Run from the project root:
+    python -m benchmarks.bench_load [--users 1000] [--tasks 100000]
+        [--concurrency 8] [--requests 5000]
+    python -m benchmarks.bench_load --save benchmarks/baseline.json
+    python -m benchmarks.bench_load --compare benchmarks/baseline.json
+
+By default the data goes into a scratch SQLite file; point --database-url
+at a Postgres database to use that instead. The database is wiped and
+reseeded on every run. Data and the request sequence come from --seed,
+so two runs with the same flags do the same work. --compare exits with
+status 1 when p95 latency or throughput is worse than the baseline by more
+than --tolerance.
+
+Requests run in threads inside one process, so Python-level work shares
+the GIL: compare runs made the same way rather than reading the numbers
+as what a multi-process server would do.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.config import Config
+from app.models import Task, TaskSummary, User
+
+WORDS = (
+    "buy call email fix plan review write clean book pay send order update "
+    "garden report invoice meeting budget design deploy test release draft"
+).split()
+PASSWORD = "bench-password"
+SEED_BATCH = 10_000
+
+# share of each operation in the request mix
+MIX = {
+    "list_all": 40,
+    "get_task": 20,
+    "me": 15,
+    "create_task": 10,
+    "update_task": 10,
+    "login": 5,
+}
+
+
+def description(rng) -> str:
+    return " ".join(rng.choices(WORDS, k=4)).capitalize()
+
+
+def seed(n_users, n_tasks, rng, hash_method):
+    """
+    Users user0..userN-1 with the tasks split evenly between them, each
+    user's tasks inserted together so their ids form one range. Returns
+    {username: (first task id, last task id)}.
+    """
+    db.drop_all()
+    db.create_all()
+    password_hash = generate_password_hash(PASSWORD, method=hash_method)
+    db.session.execute(
+        db.insert(User),
+        [
+            {"username": f"user{i}", "password_hash": password_hash, "role": "user"}
+            for i in range(n_users)
+        ],
+    )
+    user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+
+    rows = []
+    for index, user_id in enumerate(user_ids):
+        share = n_tasks // n_users + (index < n_tasks % n_users)
+        for _ in range(share):
+            rows.append(
+                {
+                    "description": description(rng),
+                    "completed": rng.random() < 0.3,
+                    "priority": rng.randint(1, 5),
+                    "user_id": user_id,
+                }
+            )
+            if len(rows) == SEED_BATCH:
+                db.session.execute(db.insert(Task), rows)
+                rows = []
+    if rows:
+        db.session.execute(db.insert(Task), rows)
+
+    # every user's summary in one statement
+    completed = db.func.sum(db.case((Task.completed, 1), else_=0))
+    db.session.execute(
+        db.insert(TaskSummary).from_select(
+            ["user_id", "total", "completed", "updated_at"],
+            db.select(
+                Task.user_id,
+                db.func.count(Task.id),
+                completed,
+                db.func.max(Task.updated_at),
+            ).group_by(Task.user_id),
+        )
+    )
+    db.session.commit()
+
+    ranges = db.session.execute(
+        db.select(User.username, db.func.min(Task.id), db.func.max(Task.id))
+        .join(Task, Task.user_id == User.id)
+        .group_by(User.username)
+    )
+    return {username: (low, high) for username, low, high in ranges}
+
+
+class Worker(threading.Thread):
+    """One client: logs in as its own user, then runs its share of the mix."""
+
+    def __init__(self, app, username, task_ids, n_requests, warmup, rng):
+        super().__init__(daemon=True)
+        self.client = app.test_client()
+        self.username = username
+        self.task_ids = task_ids
+        self.n_requests = n_requests
+        self.warmup = warmup
+        self.rng = rng
+        self.latencies = {op: [] for op in MIX}
+        self.errors = {op: 0 for op in MIX}
+        self.headers = None
+
+    def login(self):
+        # also the "login" operation of the mix
+        return self.client.post(
+            "/login", json={"username": self.username, "password": PASSWORD}
+        )
+
+    def run(self):
+        res = self.login()
+        self.headers = {"Authorization": f"Bearer {res.get_json()['access_token']}"}
+        ops, weights = list(MIX), list(MIX.values())
+        for i in range(self.warmup + self.n_requests):
+            op = self.rng.choices(ops, weights)[0]
+            start = time.perf_counter()
+            res = getattr(self, op)()
+            elapsed = time.perf_counter() - start
+            if i < self.warmup:
+                continue
+            self.latencies[op].append(elapsed)
+            if res.status_code >= 400:
+                self.errors[op] += 1
+
+    def list_all(self):
+        params = self.rng.choice(
+            [
+                "",
+                "?page=2&per_page=20",
+                "?completed=false&sort_by=priority&sort_order=desc",
+                "?cursor=&per_page=50",
+            ]
+        )
+        return self.client.get(f"/tasks{params}", headers=self.headers)
+
+    def get_task(self):
+        task_id = self.rng.randint(*self.task_ids)
+        return self.client.get(f"/tasks/{task_id}", headers=self.headers)
+
+    def me(self):
+        return self.client.get("/me", headers=self.headers)
+
+    def create_task(self):
+        return self.client.post(
+            "/tasks", json={"description": description(self.rng)}, headers=self.headers
+        )
+
+    def update_task(self):
+        task_id = self.rng.randint(*self.task_ids)
+        return self.client.put(
+            f"/tasks/{task_id}",
+            json={"priority": self.rng.randint(1, 5)},
+            headers=self.headers,
+        )
+
+
+def percentile(values, p) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(latencies, errors, elapsed=None) -> dict:
+    values = sorted(latencies)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+    if elapsed is not None:
+        summary["rps"] = round(len(values) / elapsed, 1)
+    return summary
+
+
+def run(app, ranges, args) -> dict:
+    usernames = sorted(ranges)
+    per_worker, extra = divmod(args.requests, args.concurrency)
+    workers = [
+        Worker(
+            app,
+            usernames[i % len(usernames)],
+            ranges[usernames[i % len(usernames)]],
+            per_worker + (i < extra),
+            args.warmup,
+            random.Random(args.seed + i),
+        )
+        for i in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # includes the warmup and setup logins: rps is a little conservative
+    elapsed = time.perf_counter() - start
+
+    endpoints, every = {}, []
+    for op in MIX:
+        latencies = [value for w in workers for value in w.latencies[op]]
+        every += latencies
+        endpoints[op] = summarize(latencies, sum(w.errors[op] for w in workers))
+    total = summarize(every, sum(e["errors"] for e in endpoints.values()), elapsed)
+    return {"total": total, "endpoints": endpoints}
+
+
+def compare(results, baseline, tolerance) -> list:
+    """Print the change from the baseline; return what regressed."""
+    regressions = []
+    if baseline["meta"]["workload"] != results["meta"]["workload"]:
+        print("warning: the baseline was recorded with a different workload")
+
+    def check(label, old, new):
+        change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0
+        print(
+            f"{label:12} p95 {old['p95_ms']:8.2f} -> {new['p95_ms']:8.2f} ms "
+            f"({change:+.0%})"
+        )
+        if change > tolerance:
+            regressions.append(f"{label} p95 {change:+.0%}")
+
+    for op, old in baseline["endpoints"].items():
+        if op in results["endpoints"]:
+            check(op, old, results["endpoints"][op])
+    check("total", baseline["total"], results["total"])
+
+    old_rps, new_rps = baseline["total"]["rps"], results["total"]["rps"]
+    change = (new_rps - old_rps) / old_rps
+    print(f"{'throughput':12} {old_rps:8.1f} -> {new_rps:8.1f} req/s ({change:+.0%})")
+    if change < -tolerance:
+        regressions.append(f"throughput {change:+.0%}")
+    return regressions
+
+
+def report(results):
+    print(
+        f"{'endpoint':12} {'requests':>8} {'errors':>6} "
+        f"{'p50':>9} {'p95':>9} {'p99':>9}"
+    )
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for name, row in rows:
+        print(
+            f"{name:12} {row['requests']:8} {row['errors']:6} "
+            f"{row['p50_ms']:7.2f}ms {row['p95_ms']:7.2f}ms {row['p99_ms']:7.2f}ms"
+        )
+    print(f"throughput: {results['total']['rps']} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=20, help="per client")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", help="default: a scratch SQLite file")
+    parser.add_argument(
+        "--hash-method",
+        default=Config.PASSWORD_HASH_METHOD,
+        help="password hashing for the seeded users (login cost)",
+    )
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to diff")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.mkdtemp(prefix="bench_load_")
+        url = f"sqlite:///{os.path.join(scratch, 'tasks.db')}"
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": url,
+            "PASSWORD_HASH_METHOD": args.hash_method,
+            "SQLITE_PERFORMANCE_PROFILE": url.startswith("sqlite"),
+            "DB_POOL_SIZE": args.concurrency,
+        }
+    )
+    rng = random.Random(args.seed)
+    with app.app_context():
+        start = time.perf_counter()
+        ranges = seed(args.users, args.tasks, rng, args.hash_method)
+        print(
+            f"seeded {args.users} users, {args.tasks} tasks "
+            f"in {time.perf_counter() - start:.1f} s ({db.engine.dialect.name})"
+        )
+        dialect = db.engine.dialect.name
+
+    try:
+        results = run(app, ranges, args)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    results["meta"] = {
+        "workload": {
+            "users": args.users,
+            "tasks": args.tasks,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "mix": MIX,
+            "database": dialect,
+            "hash_method": args.hash_method,
+        },
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"saved {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("regressed beyond tolerance: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Time GET /tasks?q=... for one user with many tasks (50k by default), next
+to other users' tasks (200k by default) that the search must not pay for.
+
+Run from the project root:
+    python -m benchmarks.bench_search [--tasks 50000] [--other-tasks 200000]
+"""
+import argparse
+import random
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import TestConfig
+from app.models import Task, User
+from app.summaries import refresh_summary
+
+WORDS = (
+    "buy call email fix plan review write clean book pay send order update "
+    "garden report invoice meeting budget design deploy test release draft"
+).split()
+
+VARIANTS = [
+    ("default", ""),
+    ("counted", "&include_total=true"),
+    ("by id", "&sort_by=id"),
+]
+
+
+def seed(n_tasks, n_other_tasks, rng):
+    user, other = User(username="searcher"), User(username="other")
+    for account in (user, other):
+        account.set_password("secret123")
+        db.session.add(account)
+    db.session.commit()
+    # the other user's tasks first, so the searcher's are not simply the
+    # newest rows of the index
+    for owner, count in ((other, n_other_tasks), (user, n_tasks)):
+        rows = [
+            {
+                "description": " ".join(rng.choices(WORDS, k=4)).capitalize(),
+                "user_id": owner.id,
+            }
+            for _ in range(count)
+        ]
+        if rows:
+            db.session.execute(db.insert(Task), rows)
+    # plain inserts bypass the summary that listings read their totals from
+    refresh_summary(user.id)
+    db.session.commit()
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--other-tasks", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    rng = random.Random(7)
+    with app.app_context():
+        db.create_all()
+        user = seed(args.tasks, args.other_tasks, rng)
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+    client = app.test_client()
+    for query in ["invoice", "garden report", "deploy test release", "bud"]:
+        # a search is ranked and uncounted by default; include_total=true
+        # adds the COUNT, sort_by=id skips scoring every match
+        for label, extra in VARIANTS:
+            url = f"/tasks?q={query}&per_page=20{extra}"
+            timings = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                res = client.get(url, headers=headers)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            total = res.get_json()["meta"].get("total", "-")
+            print(
+                f"q={query!r:24} {label:8} matches={total:>6} "
+                f"p50={timings[len(timings) // 2] * 1e3:6.2f} ms "
+                f"p95={timings[int(len(timings) * 0.95)] * 1e3:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
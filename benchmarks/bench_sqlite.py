@@ -0,0 +1,97 @@
+"""
+Multi-threaded read/write load against a SQLite file, with the
+SQLITE_PERFORMANCE_PROFILE pragmas on and off.
+
+Run from the project root:
+    python -m benchmarks.bench_sqlite [--threads 8] [--seconds 5]
+
+Exits with status 1 when any request failed (e.g. "database is locked").
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app, db
+
+
+def make_app(path, profile):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLITE_PERFORMANCE_PROFILE": profile,
+            "DB_POOL_SIZE": 16,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run_load(app, threads=8, seconds=5.0, write_ratio=0.2):
+    """Hammer POST /tasks and GET /tasks; return per-kind ok/error counts."""
+    client = app.test_client()
+    client.post("/register", json={"username": "loadtest", "password": "secret123"})
+    res = client.post("/login", json={"username": "loadtest", "password": "secret123"})
+    headers = {"Authorization": f"Bearer {res.get_json()['access_token']}"}
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    every = max(int(1 / write_ratio), 1) if write_ratio else 0
+
+    def worker():
+        local = {"reads": 0, "writes": 0, "errors": 0}
+        thread_client = app.test_client()
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            if every and n % every == 0:
+                res = thread_client.post(
+                    "/tasks", json={"description": "Load task"}, headers=headers
+                )
+                kind = "writes"
+            else:
+                res = thread_client.get("/tasks?per_page=20", headers=headers)
+                kind = "reads"
+            local[kind if res.status_code < 400 else "errors"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    failed = False
+    for profile in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(os.path.join(tmp, "tasks.db"), profile)
+            counts = run_load(app, args.threads, args.seconds)
+            with app.app_context():
+                db.engine.dispose()
+        label = "profile on " if profile else "profile off"
+        print(
+            f"{label}: {counts['reads'] / args.seconds:8.1f} reads/s "
+            f"{counts['writes'] / args.seconds:8.1f} writes/s "
+            f"{counts['errors']} errors"
+        )
+        failed = failed or counts["errors"] > 0
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
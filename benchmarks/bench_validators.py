@@ -0,0 +1,73 @@
+"""
+Time the description check with 10 and 10,000 forbidden words: the
+precompiled DescriptionValidator against the old lowercase-and-scan loop,
+and a full TaskSchema load.
+
+Run from the project root:
+    python -m benchmarks.bench_validators
+"""
+import random
+import re
+import string
+import timeit
+
+from app import create_app
+from app.config import TestConfig
+from app.schemas import TaskSchema
+
+ROUNDS = 2000
+DESCRIPTIONS = [
+    "Water the plants",
+    "Write the quarterly budget report for the garden committee meeting",
+    "Deploy release " + "x" * 90,
+]
+
+
+def words(n, rng):
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+        for _ in range(n)
+    ]
+
+
+def scan_loop(words):
+    # the check TaskSchema used to run: Length, Regexp, then a Python loop
+    allowed = re.compile(r"^[a-zA-Z0-9 ]+$")
+
+    def check(value):
+        if not 3 <= len(value) <= 120 or not allowed.match(value):
+            return False
+        lowered = value.lower()
+        return not any(word in lowered for word in words)
+
+    return check
+
+
+def per_call(fn):
+    def run():
+        for description in DESCRIPTIONS:
+            fn(description)
+
+    return timeit.timeit(run, number=ROUNDS) / (ROUNDS * len(DESCRIPTIONS)) * 1e6
+
+
+def main():
+    app = create_app(TestConfig)
+    rng = random.Random(7)
+    schema = TaskSchema()
+    validator = schema.fields["description"].validate
+    with app.app_context():
+        for n in (10, 10_000):
+            app.config["FORBIDDEN_WORDS"] = words(n, rng)
+            validator(DESCRIPTIONS[0])  # compile the pattern up front
+            old = per_call(scan_loop(app.config["FORBIDDEN_WORDS"]))
+            new = per_call(validator)
+            load = per_call(lambda value: schema.load({"description": value}))
+            print(
+                f"{n:6} words: loop {old:8.2f} us  precompiled {new:6.2f} us  "
+                f"TaskSchema.load {load:6.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""scope the SQLite task search index to each task's owner
+
+Revision ID: 0d7a3f61b9c2
+Revises: f5c1e8a2d946
+Create Date: 2026-10-18 11:02:51.663120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d7a3f61b9c2'
+down_revision: Union[str, Sequence[str], None] = 'f5c1e8a2d946'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _owned_terms(user_id, description):
+    # every word prefixed with its owner, "u42xbudget" (see app/search.py)
+    owner = f"'u' || {user_id} || 'x'"
+    return f"{owner} || replace({description}, ' ', ' ' || {owner})"
+
+
+OWNED_UPGRADE = [
+    "CREATE VIEW tasks_fts_source AS "
+    f"SELECT id, {_owned_terms('user_id', 'description')} AS terms FROM tasks",
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "terms, content='tasks_fts_source', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, terms) "
+    f"VALUES (new.id, {_owned_terms('new.user_id', 'new.description')}); "
+    "END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, terms) "
+    f"VALUES ('delete', old.id, {_owned_terms('old.user_id', 'old.description')}); "
+    "END",
+    "CREATE TRIGGER tasks_fts_au "
+    "AFTER UPDATE OF description, user_id ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, terms) "
+    f"VALUES ('delete', old.id, {_owned_terms('old.user_id', 'old.description')}); "
+    "INSERT INTO tasks_fts(rowid, terms) "
+    f"VALUES (new.id, {_owned_terms('new.user_id', 'new.description')}); "
+    "END",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+# the index as c4a81f09e6d3 created it: descriptions only, every user
+SHARED_DOWNGRADE = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "description, content='tasks', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF description ON tasks "
+    "BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS tasks_fts_au",
+    "DROP TRIGGER IF EXISTS tasks_fts_ad",
+    "DROP TRIGGER IF EXISTS tasks_fts_ai",
+    "DROP TABLE IF EXISTS tasks_fts",
+    "DROP VIEW IF EXISTS tasks_fts_source",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL filters its GIN matches by user_id in the same query
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for statement in DROP + OWNED_UPGRADE:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for statement in DROP + SHARED_DOWNGRADE:
+        op.execute(statement)
@@ -0,0 +1,40 @@
+"""composite indexes for task listing
+
+Revision ID: 3b9f6c2d1a47
+Revises: cf7efa139d98
+Create Date: 2026-10-17 09:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9f6c2d1a47'
+down_revision: Union[str, Sequence[str], None] = 'cf7efa139d98'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_user_priority', 'tasks', ['user_id', 'priority', 'id'], unique=False)
+    op.create_index('ix_tasks_user_created_at', 'tasks', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_user_description', 'tasks', ['user_id', 'description', 'id'], unique=False)
+    op.create_index('ix_tasks_user_completed', 'tasks', ['user_id', 'completed', 'id'], unique=False)
+    op.create_index('ix_tasks_user_completed_priority', 'tasks', ['user_id', 'completed', 'priority', 'id'], unique=False)
+    op.create_index('ix_tasks_user_completed_created_at', 'tasks', ['user_id', 'completed', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_user_completed_description', 'tasks', ['user_id', 'completed', 'description', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_completed_description', table_name='tasks')
+    op.drop_index('ix_tasks_user_completed_created_at', table_name='tasks')
+    op.drop_index('ix_tasks_user_completed_priority', table_name='tasks')
+    op.drop_index('ix_tasks_user_completed', table_name='tasks')
+    op.drop_index('ix_tasks_user_description', table_name='tasks')
+    op.drop_index('ix_tasks_user_created_at', table_name='tasks')
+    op.drop_index('ix_tasks_user_priority', table_name='tasks')
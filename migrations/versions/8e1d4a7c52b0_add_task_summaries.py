@@ -0,0 +1,47 @@
+"""add task_summaries
+
+Revision ID: 8e1d4a7c52b0
+Revises: 3b9f6c2d1a47
+Create Date: 2026-10-17 14:03:18.402771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1d4a7c52b0'
+down_revision: Union[str, Sequence[str], None] = '3b9f6c2d1a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # backfill one row per existing user
+    op.execute(
+        """
+        INSERT INTO task_summaries (user_id, total, completed, updated_at)
+        SELECT users.id,
+               COUNT(tasks.id),
+               COALESCE(SUM(CASE WHEN tasks.completed THEN 1 ELSE 0 END), 0),
+               COALESCE(MAX(tasks.updated_at), CURRENT_TIMESTAMP)
+        FROM users LEFT JOIN tasks ON tasks.user_id = users.id
+        GROUP BY users.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_summaries')
@@ -0,0 +1,38 @@
+"""task tombstones and (user_id, updated_at) index for incremental sync
+
+Revision ID: a7d3e5f8b214
+Revises: 5f2e7b9a1c30
+Create Date: 2026-10-17 22:31:47.602918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f8b214'
+down_revision: Union[str, Sequence[str], None] = '5f2e7b9a1c30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_user_deleted_at', 'task_tombstones', ['user_id', 'deleted_at', 'id'], unique=False)
+    op.create_index('ix_tasks_user_updated_at', 'tasks', ['user_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_updated_at', table_name='tasks')
+    op.drop_index('ix_task_tombstones_user_deleted_at', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
@@ -0,0 +1,32 @@
+"""add task_summaries.version for listing ETags
+
+Revision ID: b6e2d94f0c18
+Revises: 0d7a3f61b9c2
+Create Date: 2026-10-18 15:21:09.318446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d94f0c18'
+down_revision: Union[str, Sequence[str], None] = '0d7a3f61b9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('task_summaries', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('version', sa.Integer(), server_default='0', nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('task_summaries', schema=None) as batch_op:
+        batch_op.drop_column('version')
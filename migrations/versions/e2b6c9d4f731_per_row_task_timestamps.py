@@ -0,0 +1,125 @@
+"""per-row task timestamps: server defaults, update trigger, backfill
+
+Revision ID: e2b6c9d4f731
+Revises: a7d3e5f8b214
+Create Date: 2026-10-17 23:05:12.384051
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c9d4f731'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e5f8b214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# rebuilding tasks on SQLite drops its triggers; these come back afterwards
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF description ON tasks "
+    "BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+]
+
+SQLITE_TOUCH_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_touch_updated_at "
+    "AFTER UPDATE ON tasks FOR EACH ROW "
+    "WHEN new.updated_at IS old.updated_at BEGIN "
+    "UPDATE tasks SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') || '999' "
+    "WHERE id = new.id; "
+    "END"
+)
+
+POSTGRESQL_TOUCH_TRIGGER = [
+    "CREATE OR REPLACE FUNCTION tasks_touch_updated_at() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN "
+    "NEW.updated_at := timezone('utc', now()); "
+    "END IF; "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER tasks_touch_updated_at BEFORE UPDATE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION tasks_touch_updated_at()",
+]
+
+
+def _set_server_defaults(dialect, default):
+    if dialect == "sqlite":
+        # SQLite can't alter a column default: batch mode rebuilds the table
+        with op.batch_alter_table('tasks', recreate='always') as batch_op:
+            batch_op.alter_column('created_at', server_default=default)
+            batch_op.alter_column('updated_at', server_default=default)
+        if op.get_bind().execute(sa.text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+        )).first():
+            for statement in SQLITE_FTS_TRIGGERS:
+                op.execute(statement)
+    else:
+        op.alter_column('tasks', 'created_at', server_default=default)
+        op.alter_column('tasks', 'updated_at', server_default=default)
+
+
+def _backfill():
+    # rows written before the per-row defaults share the process start time;
+    # give them a fresh updated_at so every ETag, cached page and sync
+    # client picks them up once, and never leave updated_at < created_at
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.execute(
+        sa.text(
+            """
+            UPDATE tasks SET updated_at = :now
+            WHERE updated_at IN (
+                SELECT updated_at FROM tasks GROUP BY updated_at HAVING COUNT(*) > 1
+            )
+            """
+        ).bindparams(now=now)
+    )
+    op.execute("UPDATE tasks SET updated_at = created_at WHERE updated_at < created_at")
+    op.execute(
+        sa.text(
+            """
+            UPDATE task_summaries SET updated_at = :now
+            WHERE user_id IN (SELECT user_id FROM tasks WHERE updated_at = :now)
+            """
+        ).bindparams(now=now)
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    _backfill()
+    if dialect == "postgresql":
+        _set_server_defaults(dialect, sa.text("timezone('utc', now())"))
+        for statement in POSTGRESQL_TOUCH_TRIGGER:
+            op.execute(statement)
+    else:
+        _set_server_defaults(dialect, sa.text("CURRENT_TIMESTAMP"))
+        if dialect == "sqlite":
+            op.execute(SQLITE_TOUCH_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS tasks_touch_updated_at ON tasks")
+        op.execute("DROP FUNCTION IF EXISTS tasks_touch_updated_at()")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS tasks_touch_updated_at")
+    _set_server_defaults(dialect, None)
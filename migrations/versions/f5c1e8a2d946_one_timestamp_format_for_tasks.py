@@ -0,0 +1,99 @@
+"""one timestamp format for tasks: fractional server defaults, backfill
+
+Revision ID: f5c1e8a2d946
+Revises: e2b6c9d4f731
+Create Date: 2026-10-18 10:14:37.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c1e8a2d946'
+down_revision: Union[str, Sequence[str], None] = 'e2b6c9d4f731'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite compares DateTime text as text: CURRENT_TIMESTAMP's
+# "YYYY-MM-DD HH:MM:SS" sorts before any app stamp of the same second, so
+# the server side writes the app's "YYYY-MM-DD HH:MM:SS.ffffff" instead
+# (see models.SQLITE_UTC_NOW)
+SQLITE_UTC_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '999'"
+
+# rebuilding tasks on SQLite drops its triggers; these come back afterwards
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF description ON tasks "
+    "BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO tasks_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+]
+
+SQLITE_TOUCH_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_touch_updated_at "
+    "AFTER UPDATE ON tasks FOR EACH ROW "
+    "WHEN new.updated_at IS old.updated_at BEGIN "
+    f"UPDATE tasks SET updated_at = {SQLITE_UTC_NOW} "
+    "WHERE id = new.id; "
+    "END"
+)
+
+
+def _rebuild_with_default(default):
+    # SQLite can't alter a column default: batch mode rebuilds the table
+    with op.batch_alter_table('tasks', recreate='always') as batch_op:
+        batch_op.alter_column('created_at', server_default=default)
+        batch_op.alter_column('updated_at', server_default=default)
+
+
+def _normalize():
+    # second-precision (CURRENT_TIMESTAMP) and millisecond (strftime) rows
+    # get the six fractional digits the app writes; run while the touch
+    # trigger is gone, so fixing created_at doesn't move updated_at
+    for column in ('created_at', 'updated_at'):
+        op.execute(
+            f"UPDATE tasks SET {column} = "
+            f"strftime('%Y-%m-%d %H:%M:%f', {column}) || '000' "
+            f"WHERE length({column}) <> 26"
+        )
+
+
+def _restore_triggers():
+    if op.get_bind().execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+    )).first():
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+    op.execute(SQLITE_TOUCH_TRIGGER)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL stores real timestamps and already defaults to
+    # timezone('utc', now()): nothing to do there
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_with_default(sa.text(f"({SQLITE_UTC_NOW})"))
+    _normalize()
+    _restore_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    # the normalized values stay: they still read back as the same times
+    _rebuild_with_default(sa.text("CURRENT_TIMESTAMP"))
+    _restore_triggers()
@@ -1,17 +1,15 @@
+from contextlib import contextmanager
+
 import pytest
 from app import create_app, db
+from app.config import TestConfig
 from app.models import Task, User
+from app.query_audit import count_statements
 
 
 @pytest.fixture
 def app():
-    app = create_app()
-    app.config.update(
-        {
-            "TESTING": True,
-            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
-        }
-    )
+    app = create_app(TestConfig)
 
     with app.app_context():
         db.create_all()
@@ -43,25 +41,25 @@ def auth_client(client, app):
             self.client = client
             self.token = token
 
+        def _headers(self, kwargs):
+            headers = {"Authorization": f"Bearer {self.token}"}
+            headers.update(kwargs.pop("headers", {}))
+            return headers
+
         def get(self, url, **kwargs):
-            return client.get(
-                url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
-            )
+            return client.get(url, headers=self._headers(kwargs), **kwargs)
 
         def post(self, url, **kwargs):
-            return client.post(
-                url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
-            )
+            return client.post(url, headers=self._headers(kwargs), **kwargs)
 
         def put(self, url, **kwargs):
-            return client.put(
-                url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
-            )
+            return client.put(url, headers=self._headers(kwargs), **kwargs)
+
+        def patch(self, url, **kwargs):
+            return client.patch(url, headers=self._headers(kwargs), **kwargs)
 
         def delete(self, url, **kwargs):
-            return client.delete(
-                url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
-            )
+            return client.delete(url, headers=self._headers(kwargs), **kwargs)
 
     return AuthClient(client, token)
 
@@ -88,3 +86,39 @@ def add_tasks(app):
         return tasks
 
     return _add_tasks
+
+
+# ⏱ Query budget: fail when a block runs more SQL statements than allowed
+@pytest.fixture
+def query_budget(app):
+    @contextmanager
+    def _query_budget(max_statements):
+        with count_statements(db.engine) as statements:
+            yield statements
+        assert len(statements) <= max_statements, (
+            f"{len(statements)} statements, budget {max_statements}:\n"
+            + "\n".join(statements)
+        )
+
+    return _query_budget
+
+
+# local stand-in for a shared (redis-style) cache server
+class FakeSharedClient:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def fake_shared_client():
+    return FakeSharedClient()
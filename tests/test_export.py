@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+
+from app import db
+from app.models import Task
+
+
+def _seed(n, user_id=1):
+    db.session.execute(
+        db.insert(Task),
+        [
+            {
+                "description": f"Exported task number {i}",
+                "completed": i % 2 == 0,
+                "user_id": user_id,
+            }
+            for i in range(n)
+        ],
+    )
+    db.session.commit()
+
+
+def test_export_ndjson(auth_client, add_tasks, add_task):
+    add_tasks(3)
+    add_task(user_id=2)
+    res = auth_client.get("/tasks/export")
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    assert "attachment" in res.headers["Content-Disposition"]
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert rows[0]["description"] == "Task 1"
+    assert set(rows[0]) == {
+        "id", "description", "completed", "priority",
+        "created_at", "updated_at", "user_id",
+    }  # fmt: skip
+
+
+def test_export_csv_with_completed_filter(app, auth_client):
+    _seed(4)
+    res = auth_client.get("/tasks/export?format=csv&completed=true")
+    assert res.status_code == 200
+    assert res.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+    assert [row["id"] for row in rows] == ["1", "3"]
+    assert all(row["completed"] == "true" for row in rows)
+    assert rows[0]["priority"] == ""
+
+
+def test_export_csv_without_tasks_is_just_the_header(auth_client):
+    res = auth_client.get("/tasks/export?format=csv")
+    assert res.get_data(as_text=True).strip() == (
+        "id,description,completed,priority,created_at,updated_at,user_id"
+    )
+
+
+def test_export_gzip(app, auth_client):
+    _seed(50)
+    plain = auth_client.get("/tasks/export").get_data()
+    res = auth_client.get("/tasks/export", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert res.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(res.get_data()) == plain
+
+
+def test_export_rejects_unknown_format(auth_client):
+    res = auth_client.get("/tasks/export?format=xml")
+    assert res.status_code == 400
+    assert "format" in res.get_json()["error"]["details"]
+
+
+def test_export_memory_stays_bounded(app, auth_client):
+    app.config["EXPORT_BATCH_SIZE"] = 500
+    _seed(20_000)
+    db.session.expunge_all()
+
+    res = auth_client.get("/tasks/export", buffered=False)
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in res.response)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        res.close()
+    # the body is never held whole: peak stays at a few batches
+    assert size > 3_000_000
+    assert peak < size / 4
@@ -0,0 +1,112 @@
+import json
+
+from app import db
+from app.models import Task
+
+
+def _import(auth_client, body, content_type="application/x-ndjson"):
+    return auth_client.post(
+        "/tasks/import", data=body, headers={"Content-Type": content_type}
+    )
+
+
+def _ndjson(*records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def test_import_ndjson(app, auth_client):
+    app.config["IMPORT_BATCH_SIZE"] = 2
+    body = _ndjson(
+        {"description": "  first imported  "},
+        {"description": "Second imported", "completed": True, "priority": 2},
+        {"description": "Third imported", "id": 99, "user_id": 7},
+    )
+    res = _import(auth_client, body)
+    assert res.status_code == 200
+    assert res.get_json() == {"imported": 3, "failed": 0, "errors": []}
+
+    tasks = db.session.scalars(db.select(Task).order_by(Task.id)).all()
+    # TaskSchema normalization applies; ids and owners come from the server
+    assert [t.description for t in tasks] == [
+        "First imported",
+        "Second imported",
+        "Third imported",
+    ]
+    assert [t.user_id for t in tasks] == [1, 1, 1]
+    assert tasks[1].completed and tasks[1].priority == 2
+
+    stats = auth_client.get("/tasks/stats").get_json()
+    assert (stats["total"], stats["completed"]) == (3, 1)
+
+
+def test_import_reports_invalid_rows_by_number(auth_client):
+    body = (
+        _ndjson({"description": "Good row"}, {"description": "No!"})
+        + "\n"  # blank lines are skipped but still counted
+        + "{not json\n"
+        + _ndjson({"description": "Ask shrek"}, {"description": "Also good"})
+    )
+    body = _import(auth_client, body).get_json()
+    assert body["imported"] == 2
+    assert body["failed"] == 3
+    assert [error["row"] for error in body["errors"]] == [2, 4, 5]
+    assert "description" in body["errors"][0]["errors"]
+    assert "_schema" in body["errors"][1]["errors"]
+
+
+def test_import_keeps_only_the_first_errors(app, auth_client):
+    app.config["IMPORT_MAX_ERRORS"] = 2
+    body = _import(auth_client, _ndjson(*[{"description": "x"}] * 5)).get_json()
+    assert body["failed"] == 5
+    assert len(body["errors"]) == 2
+
+
+def test_import_csv_round_trips_an_export(auth_client, add_tasks):
+    add_tasks(3)
+    auth_client.post("/tasks/1/complete")
+    exported = auth_client.get("/tasks/export?format=csv").get_data()
+
+    res = _import(auth_client, exported, "text/csv")
+    assert res.get_json() == {"imported": 3, "failed": 0, "errors": []}
+    tasks = db.session.scalars(db.select(Task).filter(Task.id > 3)).all()
+    assert [(t.description, t.completed) for t in tasks] == [
+        ("Task 1", True),
+        ("Task 2", False),
+        ("Task 3", False),
+    ]
+
+
+def test_import_csv_with_blank_cells(auth_client):
+    body = "description,priority\r\nPlain row,\r\n,3\r\n"
+    body = _import(auth_client, body, "text/csv").get_json()
+    assert body["imported"] == 1
+    assert body["errors"][0]["row"] == 2
+
+
+def test_import_needs_a_known_content_type(auth_client):
+    res = _import(auth_client, "[]", "application/json")
+    assert res.status_code == 415
+
+
+def test_import_rejects_undecodable_bytes(auth_client):
+    res = _import(auth_client, b'{"description": "Fine row"}\n\xff\xfe\n')
+    assert res.status_code == 400
+    assert "_body" in res.get_json()["error"]["details"]
+
+
+def test_a_broken_upload_imports_nothing(app, auth_client):
+    app.config["IMPORT_BATCH_SIZE"] = 1
+    body = _ndjson({"description": "First row"}, {"description": "Second row"})
+    res = _import(auth_client, body.encode() + b"\xff\n")
+    assert res.status_code == 400
+    assert "nothing was imported" in res.get_json()["error"]["details"]["_body"][0]
+    assert db.session.scalar(db.select(db.func.count(Task.id))) == 0
+    assert auth_client.get("/tasks/stats").get_json()["total"] == 0
+
+
+def test_import_size_is_capped(app, auth_client):
+    body = _ndjson(*[{"description": f"Row {i}"} for i in range(50)])
+    app.config["MAX_CONTENT_LENGTH"] = len(body) - 1
+    res = _import(auth_client, body)
+    assert res.status_code == 413
+    assert db.session.scalar(db.select(db.func.count(Task.id))) == 0
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.json_provider import FastJSONProvider, orjson
+
+PAYLOAD = {
+    "b": [1, 2.5, None, True],
+    "a": "café",
+    "when": datetime(2025, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+    "naive": datetime(2025, 1, 2, 3, 4, 5),
+}
+
+
+needs_orjson = pytest.mark.skipif(orjson is None, reason="orjson not installed")
+
+
+@pytest.mark.parametrize(
+    "encoder", ["stdlib", pytest.param("orjson", marks=needs_orjson)]
+)
+def test_encoders_agree(app, encoder):
+    provider = FastJSONProvider(app, encoder=encoder)
+    response = provider.response(PAYLOAD)
+    data = json.loads(response.get_data())
+    assert data == {
+        "a": "café",
+        "b": [1, 2.5, None, True],
+        "naive": "2025-01-02T03:04:05",
+        "when": "2025-01-02T03:04:05.000006+00:00",
+    }
+    text = response.get_data(as_text=True)
+    assert text.index('"a"') < text.index('"b"')  # keys stay sorted
+    assert provider.loads(provider.dumps({"x": 1})) == {"x": 1}
+
+
+def test_unknown_encoder_is_rejected(app):
+    with pytest.raises(ValueError):
+        FastJSONProvider(app, encoder="simdjson")
+
+
+def test_list_response_same_across_encoders(app, auth_client, add_tasks):
+    add_tasks(3)
+    app.json = FastJSONProvider(app, encoder="stdlib")
+    stdlib_items = auth_client.get("/tasks").get_json()["items"]
+    app.json = FastJSONProvider(app, encoder="auto")
+    auto_items = auth_client.get("/tasks").get_json()["items"]
+    assert stdlib_items == auto_items
+    assert isinstance(auto_items[0]["created_at"], str)
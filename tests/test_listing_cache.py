@@ -0,0 +1,72 @@
+import pytest
+
+from app.cache import InProcessCache, SharedCache
+
+
+@pytest.fixture(params=["memory", "shared"])
+def cache(request, app, fake_shared_client):
+    if request.param == "memory":
+        cache = InProcessCache(max_entries=3)
+    else:
+        cache = SharedCache(fake_shared_client)
+    app.extensions["listing_cache"] = cache
+    return cache
+
+
+def test_repeated_listing_is_served_from_cache(cache, auth_client, add_tasks):
+    add_tasks(3)
+    first = auth_client.get("/tasks?per_page=2")
+    second = auth_client.get("/tasks?per_page=2")
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+    etag = first.headers["ETag"]
+    res = auth_client.get("/tasks?per_page=2", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+
+def test_writes_invalidate_cached_listings(cache, auth_client):
+    created = auth_client.post("/tasks", json={"description": "First task"})
+    task_id = created.get_json()["id"]
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 1
+
+    auth_client.post("/tasks", json={"description": "Second task"})
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 2
+
+    auth_client.post(f"/tasks/{task_id}/complete")
+    items = auth_client.get("/tasks").get_json()["items"]
+    assert items[0]["completed"] is True
+
+    auth_client.put(f"/tasks/{task_id}", json={"priority": 9})
+    assert auth_client.get("/tasks").get_json()["items"][0]["priority"] == 9
+
+    auth_client.delete(f"/tasks/{task_id}")
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 1
+
+    auth_client.delete("/tasks/bulk", json={"ids": [task_id + 1]})
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 0
+    assert cache.stats.hits == 0
+
+
+def test_cache_keys_cover_every_parameter(cache, auth_client, add_tasks):
+    add_tasks(3)
+    by_id = auth_client.get("/tasks?sort_by=id&sort_order=desc").get_json()
+    by_desc = auth_client.get("/tasks?sort_by=id&sort_order=asc").get_json()
+    assert by_id["items"] != by_desc["items"]
+    assert cache.stats.hits == 0
+
+
+def test_in_process_cache_is_lru_bounded(app, auth_client, add_tasks):
+    cache = InProcessCache(max_entries=2)
+    app.extensions["listing_cache"] = cache
+    add_tasks(1)
+    for page_size in (1, 2, 3):
+        auth_client.get(f"/tasks?per_page={page_size}")
+    auth_client.get("/tasks?per_page=3")  # still cached
+    auth_client.get("/tasks?per_page=1")  # evicted
+    assert cache.metrics()["size"] == 2
+    assert cache.stats.evictions == 2
+    assert (cache.stats.hits, cache.stats.misses) == (1, 4)
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from app import db
+from app.models import User
+from app.passwords import HashingPool, HashingPoolFull, needs_rehash
+
+
+def make_user(method, username="alice", password="secret123"):
+    user = User(username=username)
+    user.set_password(password, method=method)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def login(client, username="alice", password="secret123"):
+    return client.post("/login", json={"username": username, "password": password})
+
+
+def test_hash_method_is_configurable(app):
+    user = make_user(None)
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+    assert user.check_password("secret123")
+
+
+def test_login_rehashes_outdated_hash(app, client):
+    user = make_user("pbkdf2:sha256:500")
+    old_hash = user.password_hash
+    assert needs_rehash(old_hash, app.config["PASSWORD_HASH_METHOD"])
+
+    assert login(client).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash != old_hash
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+
+    # current hashes are left alone
+    current_hash = user.password_hash
+    assert login(client).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash == current_hash
+
+
+def test_failed_login_does_not_rehash(app, client):
+    user = make_user("pbkdf2:sha256:500")
+    old_hash = user.password_hash
+    assert login(client, password="wrong-pass").status_code == 401
+    db.session.refresh(user)
+    assert user.password_hash == old_hash
+
+
+def test_login_on_hashing_pool(app, client):
+    make_user(None)
+    app.extensions["password_pool"] = HashingPool(workers=2)
+    assert login(client).status_code == 200
+    assert login(client, password="wrong-pass").status_code == 401
+
+
+def test_hashing_pool_sheds_load_when_full():
+    pool = HashingPool(workers=1, queue_limit=0)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    busy = threading.Thread(target=pool.run, args=(slow,))
+    busy.start()
+    started.wait(5)
+    with pytest.raises(HashingPoolFull):
+        pool.run(lambda: None)  # the only slot is taken: fail fast, don't queue
+
+    release.set()
+    busy.join()
+    assert pool.run(lambda: "ok") == "ok"
+    pool.shutdown()
+
+
+def test_login_storm_gets_503(app, client):
+    make_user(None)
+
+    class FullPool:
+        def run(self, fn, *args, timeout=None):
+            raise HashingPoolFull()
+
+    app.extensions["password_pool"] = FullPool()
+    res = login(client)
+    assert res.status_code == 503
+    assert res.get_json()["error"]["code"] == 503
+    assert res.headers["Retry-After"] == "1"
+
+
+def test_hash_timeout_gets_503(app, client, monkeypatch):
+    from app import auth_routes
+
+    make_user(None)
+    release = threading.Event()
+    monkeypatch.setattr(auth_routes, "verify_and_rehash", lambda *a: release.wait(5))
+    app.config["PASSWORD_HASH_TIMEOUT"] = 0.05
+    app.extensions["password_pool"] = HashingPool(workers=1)
+
+    res = login(client)
+    release.set()
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+    app.extensions["password_pool"].shutdown()
+
+
+def test_register_hashes_on_pool(app, client):
+    calls = []
+
+    class RecordingPool(HashingPool):
+        def run(self, fn, *args, timeout=None):
+            calls.append(fn.__name__)
+            return super().run(fn, *args, timeout=timeout)
+
+    app.extensions["password_pool"] = RecordingPool(workers=1)
+    res = client.post("/register", json={"username": "bob", "password": "secret123"})
+    assert res.status_code == 201
+    assert calls == ["hash_password"]
+    # the pool thread has no app context: the configured method is passed in
+    user = db.session.scalars(db.select(User).filter_by(username="bob")).one()
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+    assert login(client, "bob").status_code == 200
+    app.extensions["password_pool"].shutdown()
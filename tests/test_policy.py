@@ -0,0 +1,93 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import Task, User
+from app.utils import policy
+
+
+@pytest.fixture
+def login_as(app, client):
+    """Create a user with the given role and return their auth headers."""
+
+    def _login_as(role, username=None):
+        user = User(username=username or role, role=role)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(str(user.id), additional_claims={"role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    return _login_as
+
+
+def test_admin_can_delete_any_task(client, login_as):
+    owner = login_as("user", "owner")
+    task_id = client.post(
+        "/tasks", json={"description": "Owned task"}, headers=owner
+    ).get_json()["id"]
+
+    assert client.delete(f"/admin/tasks/{task_id}", headers=owner).status_code == 403
+    admin = login_as("admin")
+    assert client.delete(f"/admin/tasks/{task_id}", headers=admin).status_code == 204
+    assert db.session.get(Task, task_id) is None
+    assert client.delete(f"/admin/tasks/{task_id}", headers=admin).status_code == 404
+
+
+def test_routes_check_permissions(client, login_as):
+    user, manager, admin = login_as("user"), login_as("manager"), login_as("admin")
+    assert client.get("/reports", headers=user).status_code == 403
+    assert client.get("/reports", headers=manager).status_code == 200
+    assert client.get("/reports", headers=admin).status_code == 200
+    assert client.get("/admin/dashboard", headers=manager).status_code == 403
+    assert client.get("/admin/dashboard", headers=admin).status_code == 200
+    assert client.get("/admin/dashboard").status_code == 401
+
+
+def test_only_owners_read_a_task(client, login_as):
+    owner = login_as("user", "owner")
+    task_id = client.post(
+        "/tasks", json={"description": "Owned task"}, headers=owner
+    ).get_json()["id"]
+
+    assert client.get(f"/tasks/{task_id}", headers=owner).status_code == 200
+    manager, other = login_as("manager"), login_as("user", "other")
+    assert client.get(f"/tasks/{task_id}", headers=manager).status_code == 404
+    assert client.get(f"/tasks/{task_id}", headers=other).status_code == 404
+    # admins delete through /admin/tasks/<id>; they don't read others' tasks
+    admin = login_as("admin")
+    assert client.get(f"/tasks/{task_id}", headers=admin).status_code == 404
+
+
+@pytest.mark.parametrize("claims", [{}, {"role": "auditor"}])
+def test_tokens_without_a_known_role_act_as_users(app, client, claims):
+    user = User(username="legacy")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    task = Task(description="Legacy task", user_id=user.id)
+    db.session.add(task)
+    db.session.commit()
+    token = create_access_token(str(user.id), additional_claims=claims)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get(f"/tasks/{task.id}", headers=headers).status_code == 200
+    assert client.get("/reports", headers=headers).status_code == 403
+
+
+def test_token_is_verified_once_per_request(client, login_as, monkeypatch):
+    admin = login_as("admin")
+    calls = []
+    verify = policy.verify_jwt_in_request
+    monkeypatch.setattr(
+        policy, "verify_jwt_in_request", lambda: calls.append(1) or verify()
+    )
+    client.get("/admin/dashboard", headers=admin)
+    client.get("/admin/dashboard", headers=admin)
+    assert len(calls) == 2
+
+
+def test_role_permissions_are_precompiled():
+    assert isinstance(policy._PERMISSIONS["admin"], frozenset)
+    assert policy._PERMISSIONS["manager"] >= {"tasks:own", "reports:read"}
+    assert "tasks:delete_any" not in policy._PERMISSIONS["manager"]
@@ -0,0 +1,67 @@
+from app import create_app, db
+from app.config import Config, TestConfig
+from app.pool import MeteredQueuePool, engine_options, pool_metrics
+
+
+def config_for(uri, **overrides):
+    config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    config.update(SQLALCHEMY_DATABASE_URI=uri, **overrides)
+    return config
+
+
+def test_engine_options_for_postgres():
+    options = engine_options(
+        config_for(
+            "postgresql://app@db/tasks",
+            DB_POOL_SIZE=20,
+            DB_MAX_OVERFLOW=5,
+            DB_POOL_RECYCLE=1800,
+            DB_POOL_PRE_PING=True,
+            DB_STATEMENT_TIMEOUT_MS=2500,
+        )
+    )
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["pool_recycle"] == 1800
+    assert options["pool_pre_ping"] is True
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["connect_args"] == {"options": "-c statement_timeout=2500"}
+
+
+def test_engine_options_for_memory_sqlite():
+    options = engine_options(config_for("sqlite:///:memory:"))
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+
+def test_pool_metrics_hook(tmp_path):
+    reports = []
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'tasks.db'}",
+            "DB_POOL_SIZE": 2,
+            "DB_POOL_METRICS_HOOK": reports.append,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        assert isinstance(db.engine.pool, MeteredQueuePool)
+
+    client = app.test_client()
+    client.post("/register", json={"username": "alice", "password": "secret123"})
+    assert reports
+    assert reports[-1]["size"] == 2
+    assert reports[-1]["checkouts"] >= 1
+    assert reports[-1]["overflow"] == 0
+
+    with app.app_context():
+        snapshot = pool_metrics(db.engine)
+        db.engine.dispose()
+    assert snapshot["checked_out"] == 0
+
+
+def test_create_app_uses_given_config():
+    app = create_app(TestConfig)
+    assert app.config["TESTING"] is True
+    assert app.config["SQLALCHEMY_DATABASE_URI"] == TestConfig.SQLALCHEMY_DATABASE_URI
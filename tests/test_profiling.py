@@ -0,0 +1,111 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import TestConfig
+from app.models import User
+
+
+@pytest.fixture
+def app(tmp_path):
+    class ProfiledConfig(TestConfig):
+        PROFILING = True
+        PROFILE_DIR = str(tmp_path / "profiles")
+        METRICS_TOKEN = "scrape-me"
+
+    app = create_app(ProfiledConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _server_timing(res):
+    parts = res.headers["Server-Timing"].split(",")
+    entries = [part.strip().split(";") for part in parts]
+    return {entry[0]: entry[1:] for entry in entries}
+
+
+def test_server_timing_covers_the_phases(auth_client, add_tasks):
+    add_tasks(3)
+    res = auth_client.get("/tasks?per_page=2")
+    assert res.status_code == 200
+    timing = _server_timing(res)
+    assert {"jwt", "schema", "sql", "serialize", "json", "total"} <= set(timing)
+    assert timing["total"][0].startswith("dur=")
+
+    res = auth_client.post("/tasks", json={"description": "Timed task"})
+    assert res.status_code == 201
+    assert "schema" in _server_timing(res)
+
+
+def test_metrics_histograms(client, auth_client):
+    auth_client.get("/tasks")
+    auth_client.get("/tasks")
+    res = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    body = res.get_data(as_text=True)
+
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_request_duration_seconds_count{method="GET",endpoint="tasks.list_all",'
+        'status="2xx"} 2'
+    ) in body
+    assert 'http_request_phase_seconds_bucket{phase="sql",le="+Inf"}' in body
+    assert 'http_request_sql_statements_count{endpoint="tasks.list_all"} 2' in body
+
+
+def test_metrics_token(app, client):
+    assert client.get("/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer guess"}
+    assert client.get("/metrics", headers=wrong).status_code == 401
+    res = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert res.status_code == 200
+
+    # no token configured: closed, not open
+    app.config["METRICS_TOKEN"] = None
+    assert client.get("/metrics").status_code == 404
+
+
+def test_profile_dump_for_admins_only(app, client, tmp_path):
+    for role in ("user", "admin"):
+        user = User(username=role, role=role)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(str(user.id), additional_claims={"role": role})
+        headers = {"Authorization": f"Bearer {token}", "X-Profile": "1"}
+        res = client.get("/tasks", headers=headers)
+        assert res.status_code == 200
+        if role == "user":
+            assert "X-Profile-Dump" not in res.headers
+
+    dump = res.headers["X-Profile-Dump"]
+    assert "-tasks-list_all-" in dump
+    assert (tmp_path / "profiles" / dump).is_file()
+
+
+def test_profiled_request_verifies_the_token_once(app, client, monkeypatch):
+    from app.utils import policy
+
+    admin = User(username="admin", role="admin")
+    admin.set_password("password123")
+    db.session.add(admin)
+    db.session.commit()
+    token = create_access_token(str(admin.id), additional_claims={"role": "admin"})
+    calls = []
+    verify = policy.verify_jwt_in_request
+    monkeypatch.setattr(
+        policy, "verify_jwt_in_request", lambda: calls.append(1) or verify()
+    )
+    headers = {"Authorization": f"Bearer {token}", "X-Profile": "1"}
+    res = client.get("/admin/dashboard", headers=headers)
+    assert res.status_code == 200 and "X-Profile-Dump" in res.headers
+    # the profiler's admin check and the route share one principal
+    assert len(calls) == 1
+
+
+def test_profiling_is_off_by_default():
+    client = create_app(TestConfig).test_client()
+    assert "Server-Timing" not in client.get("/health").headers
+    assert client.get("/metrics").status_code == 404
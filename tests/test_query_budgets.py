@@ -0,0 +1,182 @@
+import logging
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import TestConfig
+from app.models import Task, User
+from app.summaries import refresh_summary
+
+SEEDED_TASKS = 20
+
+# (method, url, request kwargs, max SQL statements) for every route, run
+# against SEEDED_TASKS tasks: a budget that holds here doesn't grow per row
+USER_ROUTES = [
+    ("get", "/health", {}, 0),
+    ("post", "/tasks", {"json": {"description": "Budget task"}}, 3),
+    (
+        "post",
+        "/tasks/bulk",
+        {"json": [{"description": f"Bulk task {i}"} for i in range(10)]},
+        2,
+    ),
+    (
+        "patch",
+        "/tasks/bulk",
+        {"json": [{"id": i, "priority": i % 3} for i in range(1, 11)]},
+        8,
+    ),
+    ("delete", "/tasks/bulk", {"json": {"ids": list(range(1, 11))}}, 6),
+    ("get", "/tasks", {}, 2),
+    ("get", "/tasks?per_page=20&sort_by=priority&sort_order=desc", {}, 2),
+    ("get", "/tasks?cursor=&per_page=20", {}, 2),
+    ("get", "/tasks?q=task&per_page=20", {}, 2),
+    ("get", "/tasks?q=task&per_page=20&include_total=true", {}, 3),
+    ("get", "/tasks?fields=description&include_total=false", {}, 2),
+    ("get", "/tasks/changes", {}, 2),
+    ("get", "/tasks/export", {}, 1),
+    (
+        "post",
+        "/tasks/import",
+        {
+            "data": "".join(
+                f'{{"description": "Imported {i}"}}\n' for i in range(10)
+            ),
+            "content_type": "application/x-ndjson",
+        },
+        2,
+    ),
+    ("get", "/tasks/stream", {"buffered": False}, 0),
+    ("get", "/tasks/stats", {}, 1),
+    ("get", "/tasks/1", {}, 1),
+    ("put", "/tasks/1", {"json": {"priority": 3}}, 4),
+    ("post", "/tasks/1/complete", {}, 4),
+    ("delete", "/tasks/1", {}, 4),
+    ("get", "/me", {}, 1),
+    ("post", "/logout", {}, 0),
+]
+
+ADMIN_ROUTES = [
+    ("delete", "/admin/tasks/1", {}, 4),
+    ("get", "/admin/dashboard", {}, 0),
+    ("get", "/admin/db-pool", {}, 0),
+    ("get", "/admin/cache", {}, 0),
+    ("get", "/reports", {}, 0),
+]
+
+ANONYMOUS_ROUTES = [
+    ("post", "/register", {"json": {"username": "new", "password": "secret123"}}, 4),
+    (
+        "post",
+        "/login",
+        {"json": {"username": "testuser", "password": "password123"}},
+        1,
+    ),
+]
+
+
+@pytest.fixture
+def seeded(auth_client, add_tasks):
+    other = User(username="other")
+    other.set_password("password123")
+    db.session.add(other)
+    db.session.commit()
+    add_tasks(SEEDED_TASKS)
+    add_tasks(3, user_id=other.id)
+    # summaries are built lazily on first use; budgets are for steady state
+    refresh_summary(1)
+    refresh_summary(other.id)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _admin_headers():
+    admin = User(username="admin", role="admin")
+    admin.set_password("password123")
+    db.session.add(admin)
+    db.session.commit()
+    token = create_access_token(str(admin.id), additional_claims={"role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _route_id(route):
+    return f"{route[0].upper()} {route[1]}"
+
+
+def _check(send, route, query_budget, headers=None):
+    method, url, kwargs, budget = route
+    if headers:
+        kwargs = dict(kwargs, headers=headers)
+    with query_budget(budget):
+        res = getattr(send, method)(url, **kwargs)
+        if kwargs.get("buffered") is False:
+            res.close()  # an endless stream: budget its setup only
+        else:
+            res.get_data()  # streamed bodies run their queries while read
+    assert res.status_code < 400, res.status
+
+
+@pytest.mark.parametrize("route", USER_ROUTES, ids=_route_id)
+def test_user_route_budgets(seeded, auth_client, query_budget, route):
+    _check(auth_client, route, query_budget)
+
+
+@pytest.mark.parametrize("route", ADMIN_ROUTES, ids=_route_id)
+def test_admin_route_budgets(seeded, client, query_budget, route):
+    _check(client, route, query_budget, headers=_admin_headers())
+
+
+@pytest.mark.parametrize("route", ANONYMOUS_ROUTES, ids=_route_id)
+def test_anonymous_route_budgets(seeded, client, query_budget, route):
+    _check(client, route, query_budget)
+
+
+@pytest.mark.parametrize("n_items", [2, 40])
+def test_bulk_writes_do_not_grow_per_item(seeded, auth_client, query_budget, n_items):
+    create = [{"description": f"Bulk task {i}"} for i in range(n_items)]
+    update = [{"id": i, "priority": 4} for i in range(1, n_items // 2 + 1)]
+    with query_budget(2):
+        assert auth_client.post("/tasks/bulk", json=create).status_code == 201
+    with query_budget(8):
+        assert auth_client.patch("/tasks/bulk", json=update).status_code == 200
+
+
+def test_query_budget_reports_the_statements(auth_client, add_tasks, query_budget):
+    add_tasks(2)
+    with pytest.raises(AssertionError, match="3 statements, budget 1") as err:
+        with query_budget(1):
+            for task_id in (1, 2, 3):
+                db.session.get(Task, task_id)
+    assert "FROM tasks" in str(err.value)
+
+
+def test_query_audit_logs_repeats_and_slow_queries(caplog):
+    class AuditConfig(TestConfig):
+        QUERY_AUDIT = True
+        QUERY_REPEAT_THRESHOLD = 3
+        SLOW_QUERY_MS = 0  # every statement counts as slow
+
+    app = create_app(AuditConfig)
+
+    # an N+1 on purpose: one SELECT per task
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        ids = db.session.scalars(db.select(Task.id)).all()
+        return {"descriptions": [db.session.get(Task, i).description for i in ids]}
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Task(description=f"Task {i}", user_id=1) for i in range(4))
+        db.session.commit()
+        db.session.expunge_all()
+        with caplog.at_level(logging.WARNING, logger="app.queries"):
+            assert app.test_client().get("/n-plus-one").status_code == 200
+        db.drop_all()
+
+    repeated = [r.message for r in caplog.records if "(N+1?)" in r.message]
+    assert len(repeated) == 1 and "4 times" in repeated[0]
+    slow = [r.message for r in caplog.records if "slow query" in r.message]
+    assert len(slow) == 5
+    assert "plan:" in slow[0] and "SCAN tasks" in slow[0]
+    assert "SEARCH tasks USING INTEGER PRIMARY KEY" in slow[1]
@@ -0,0 +1,48 @@
+# query-plan regression tests: every GET /tasks shape must be served from an index
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from app import db
+from app.pagination import keyset_filter, listing_query
+from app.sync import task_changes_query, tombstones_query
+
+SORT_FIELDS = ["id", "priority", "created_at", "description"]
+
+
+def explain(query):
+    compiled = query.compile(
+        dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+
+def assert_indexed(plan):
+    assert not any(step.startswith("SCAN tasks") for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("USING" in step and "INDEX" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("completed", [None, True, False])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", SORT_FIELDS)
+def test_listing_uses_index(app, sort_by, sort_order, completed):
+    query = listing_query(1, completed, sort_by, sort_order).limit(10)
+    assert_indexed(explain(query))
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", SORT_FIELDS)
+def test_keyset_page_uses_index(app, sort_by, sort_order):
+    value = {"id": 5, "priority": 2, "description": "Task"}.get(sort_by)
+    if sort_by == "created_at":
+        value = "2025-01-01 00:00:00"
+    query = listing_query(1, None, sort_by, sort_order)
+    query = query.filter(keyset_filter(sort_by, sort_order, value, 5)).limit(10)
+    assert_indexed(explain(query))
+
+
+@pytest.mark.parametrize("since_key", [None, ("2025-01-01 00:00:00", 5)])
+def test_sync_batches_use_index(app, since_key):
+    assert_indexed(explain(task_changes_query(1, since_key, 100)))
+    assert_indexed(explain(tombstones_query(1, since_key, 100)))
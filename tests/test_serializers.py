@@ -0,0 +1,54 @@
+# parity tests: the fast task serializer must match marshmallow exactly
+import json
+from datetime import datetime, timezone
+
+import pytest
+from marshmallow import Schema, fields
+
+from app import db
+from app.models import Task
+from app.schemas import TaskSchema
+from app.serializers import FastSerializer, task_serializer
+
+
+def seed_tasks():
+    tasks = [
+        Task(description="Plain task", user_id=1),
+        Task(description="Done task", completed=True, priority=3, user_id=1),
+        Task(description="Negative priority", priority=-7, user_id=2),
+        Task(description="Unicode café", priority=0, user_id=1),
+    ]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return tasks
+
+
+def test_dump_many_matches_marshmallow(app):
+    tasks = seed_tasks()
+    assert task_serializer.dump_many(tasks) == TaskSchema(many=True).dump(tasks)
+
+
+def test_dump_matches_marshmallow_byte_for_byte(app):
+    tasks = seed_tasks()
+    tasks[0].created_at = datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    for task in tasks:
+        fast = json.dumps(task_serializer.dump(task))
+        slow = json.dumps(TaskSchema().dump(task))
+        assert fast == slow
+
+
+def test_list_response_same_with_and_without_fast_path(app, auth_client, add_tasks):
+    add_tasks(5)
+    fast = auth_client.get("/tasks?per_page=100").data
+    app.config["TASK_FAST_SERIALIZER"] = False
+    slow = auth_client.get("/tasks?per_page=100").data
+    assert fast == slow
+
+
+def test_unsupported_field_is_rejected():
+    class WithNested(Schema):
+        id = fields.Int()
+        tags = fields.List(fields.Str())
+
+    with pytest.raises(TypeError):
+        FastSerializer(WithNested())
@@ -0,0 +1,31 @@
+from app import create_app, db
+
+
+def make_app(path, profile):
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLITE_PERFORMANCE_PROFILE": profile,
+        }
+    )
+
+
+def pragma(name):
+    return db.session.execute(db.text(f"PRAGMA {name}")).scalar()
+
+
+def test_profile_sets_pragmas(tmp_path):
+    app = make_app(tmp_path / "tasks.db", profile=True)
+    with app.app_context():
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 5000
+        assert pragma("temp_store") == 2  # MEMORY
+        db.engine.dispose()
+
+
+def test_profile_off_keeps_defaults(tmp_path):
+    app = make_app(tmp_path / "tasks.db", profile=False)
+    with app.app_context():
+        assert pragma("journal_mode") == "delete"
+        db.engine.dispose()
@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from app.streams import InProcessBroker
+
+
+@pytest.fixture
+def stream(app, auth_client):
+    """Open /tasks/stream and return an iterator over its SSE messages."""
+    app.config["TASK_STREAM_HEARTBEAT"] = 0.05
+    responses = []
+
+    def _open(**headers):
+        res = auth_client.get("/tasks/stream", headers=headers, buffered=False)
+        assert res.status_code == 200
+        assert res.mimetype == "text/event-stream"
+        responses.append(res)
+        chunks = iter(res.response)
+        assert next(chunks) == b"retry: 3000\n\n"
+        return (chunk.decode() for chunk in chunks)
+
+    yield _open
+    for res in responses:
+        res.close()
+
+
+def parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def test_stream_pushes_task_changes(app, stream, auth_client):
+    broker = app.extensions["task_stream"]
+    messages = stream()
+    res = auth_client.post("/tasks", json={"description": "Live task"})
+    task_id = res.get_json()["id"]
+    created = parse(next(messages))
+    assert created["event"] == "task.created"
+    assert created["id"] == broker.event_id(1)
+    assert created["data"]["description"] == "Live task"
+
+    auth_client.post(f"/tasks/{task_id}/complete")
+    auth_client.delete(f"/tasks/{task_id}")
+    assert parse(next(messages))["event"] == "task.completed"
+    deleted = parse(next(messages))
+    assert deleted["event"] == "task.deleted"
+    assert deleted["id"] == broker.event_id(3)
+    assert deleted["data"] == {"id": task_id, "user_id": 1}
+
+
+def test_stream_sends_heartbeats(stream):
+    messages = stream()
+    assert next(messages) == ": heartbeat\n\n"
+
+
+def test_stream_resumes_from_last_event_id(app, stream, auth_client):
+    broker = app.extensions["task_stream"]
+    stream()  # another tab keeps the user's history
+    for i in range(3):
+        auth_client.post("/tasks", json={"description": f"Task {i}"})
+    messages = stream(**{"Last-Event-ID": broker.event_id(1)})
+    replayed = [parse(next(messages)) for _ in range(2)]
+    assert [m["id"] for m in replayed] == [broker.event_id(2), broker.event_id(3)]
+    assert [m["data"]["description"] for m in replayed] == ["Task 1", "Task 2"]
+
+
+def test_stream_asks_for_reload_when_events_were_missed(app, stream, auth_client):
+    broker = app.extensions["task_stream"] = InProcessBroker(history=2)
+    stream()
+    for i in range(4):
+        auth_client.post("/tasks", json={"description": f"Task {i}"})
+    messages = stream(**{"Last-Event-ID": broker.event_id(1)})
+    assert parse(next(messages))["event"] == "reset"
+
+
+@pytest.mark.parametrize("foreign", [False, True])
+def test_stream_resets_ids_it_cannot_vouch_for(app, stream, auth_client, foreign):
+    broker = app.extensions["task_stream"]
+    first = auth_client.get("/tasks/stream", buffered=False)
+    chunks = iter(first.response)
+    next(chunks)
+    auth_client.post("/tasks", json={"description": "Seen"})
+    last_id = parse(next(chunks).decode())["id"]
+    if foreign:
+        # an id handed out by another worker process
+        last_id = InProcessBroker().event_id(1)
+    else:
+        # the only stream closes: the user's history goes with it
+        first.close()
+        assert broker.metrics()["users"] == 0
+        auth_client.post("/tasks", json={"description": "Missed"})
+    messages = stream(**{"Last-Event-ID": last_id})
+    assert parse(next(messages))["event"] == "reset"
+    first.close()
+
+
+def test_writes_without_subscribers_queue_nothing(
+    app, stream, auth_client, monkeypatch
+):
+    queued = []
+    monkeypatch.setattr(
+        "app.outbox.queue_stream_events", lambda session, events: queued.extend(events)
+    )
+    auth_client.post("/tasks", json={"description": "Unheard"})
+    assert queued == []
+
+    stream()
+    auth_client.post("/tasks", json={"description": "Heard"})
+    assert [event[2]["description"] for event in queued] == ["Heard"]
+
+
+def test_rolled_back_writes_are_not_published(stream, auth_client):
+    messages = stream()
+    auth_client.post("/tasks", json={"description": "x"})  # fails validation
+    assert next(messages) == ": heartbeat\n\n"
+
+
+def test_bad_last_event_id(auth_client):
+    res = auth_client.get("/tasks/stream", headers={"Last-Event-ID": "abc"})
+    assert res.status_code == 400
+
+
+def test_broker_fans_out_per_user():
+    broker = InProcessBroker(history=10, queue_size=1)
+    mine, _ = broker.subscribe(1)
+    theirs, _ = broker.subscribe(2)
+    broker.publish(1, "task.created", {"id": 1})
+    assert mine.queue.get_nowait().data == {"id": 1}
+    assert theirs.queue.empty()
+
+    # a subscriber that can't keep up is flagged for a resync
+    broker.publish(1, "task.created", {"id": 2})
+    broker.publish(1, "task.created", {"id": 3})
+    assert mine.overflowed
+
+    broker.unsubscribe(mine)
+    broker.unsubscribe(theirs)
+    assert broker.metrics() == {"backend": "memory", "subscribers": 0, "users": 0}
+    # nobody listens for user 1 any more: nothing is kept for them
+    assert broker.publish(1, "task.created", {"id": 4}) is None
+    assert broker.metrics()["users"] == 0
+
+
+def test_closed_stream_unsubscribes(app, auth_client):
+    broker = app.extensions["task_stream"]
+    res = auth_client.get("/tasks/stream", buffered=False)
+    next(iter(res.response))
+    assert broker.metrics()["subscribers"] == 1
+    res.close()
+    assert broker.metrics()["subscribers"] == 0
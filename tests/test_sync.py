@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.sync import encode_token
+
+
+@pytest.fixture
+def sync(app, auth_client):
+    """GET /tasks/changes and return the JSON body."""
+    app.config["SYNC_SAFETY_WINDOW_MS"] = 0
+
+    def _sync(since=None, limit=None, status=200):
+        params = {}
+        if since is not None:
+            params["since"] = since
+        if limit is not None:
+            params["limit"] = limit
+        res = auth_client.get("/tasks/changes", query_string=params)
+        assert res.status_code == status, res.get_json()
+        return res.get_json()
+
+    return _sync
+
+
+def test_full_sync_is_batched(sync, add_tasks):
+    add_tasks(5)
+    seen, since = [], None
+    while True:
+        body = sync(since, limit=2)
+        seen += [task["id"] for task in body["changes"]]
+        since = body["next"]
+        if not body["has_more"]:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+    assert body["deleted"] == []
+
+    # nothing changed since: an empty batch and no more to fetch
+    body = sync(since)
+    assert body["changes"] == [] and body["deleted"] == []
+    assert body["has_more"] is False
+
+
+def test_only_changes_and_deletes_after_the_token(sync, auth_client, add_tasks):
+    add_tasks(4)
+    since = sync()["next"]
+
+    auth_client.put("/tasks/2", json={"priority": 5})
+    auth_client.delete("/tasks/3")
+    auth_client.delete("/tasks/bulk", json={"ids": [4]})
+    res = auth_client.post("/tasks", json={"description": "New task"})
+    new_id = res.get_json()["id"]
+
+    body = sync(since)
+    assert [task["id"] for task in body["changes"]] == [2, new_id]
+    assert body["changes"][0]["priority"] == 5
+    assert body["deleted"] == [3, 4]
+
+    body = sync(body["next"])
+    assert body["changes"] == [] and body["deleted"] == []
+
+
+def test_other_users_changes_are_not_synced(sync, add_task):
+    add_task(user_id=2)
+    assert sync()["changes"] == []
+
+
+def test_recent_changes_are_resent_inside_the_safety_window(app, sync, add_tasks):
+    app.config["SYNC_SAFETY_WINDOW_MS"] = 60_000
+    add_tasks(2)
+    first = sync()
+    assert len(first["changes"]) == 2
+    # the token stayed behind the window, so the same changes come again
+    again = sync(first["next"])
+    assert [t["id"] for t in again["changes"]] == [t["id"] for t in first["changes"]]
+
+
+def test_invalid_sync_token(sync):
+    body = sync("not-a-token", status=400)
+    assert "since" in body["error"]["details"]
+
+
+def test_expired_sync_token(app, sync):
+    old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=31)
+    sync(encode_token((old, 1), (old, 1)), status=410)
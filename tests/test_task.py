@@ -1,3 +1,5 @@
+import pytest
+
 # user authentication related tests
 
 
@@ -217,3 +219,503 @@ def test_generic_exception_handler(app, auth_client, monkeypatch, add_task):
     assert res.status_code == 500
     data = res.get_json()
     assert data["error"]["type"] == "InternalServerError"
+
+
+# keyset (cursor) pagination
+
+
+def _walk_cursor(auth_client, query):
+    items, cursor = [], ""
+    while cursor is not None:
+        res = auth_client.get(f"/tasks?{query}&per_page=4&cursor={cursor}")
+        assert res.status_code == 200
+        data = res.get_json()
+        items.extend(data["items"])
+        cursor = data["meta"]["next_cursor"]
+    return items
+
+
+def test_cursor_pagination_walks_all_tasks(auth_client, add_tasks):
+    add_tasks(10)
+    res = auth_client.get("/tasks?cursor=&per_page=4")
+    data = res.get_json()
+    assert data["meta"]["total"] == 10
+    assert data["meta"]["has_next"] is True
+    assert "page" not in data["meta"]
+
+    items = _walk_cursor(auth_client, "sort_by=id")
+    assert [item["id"] for item in items] == list(range(1, 11))
+
+
+def test_cursor_pagination_matches_offset_order(auth_client, add_tasks):
+    from app import db
+
+    tasks = add_tasks(9)
+    for i, task in enumerate(tasks):
+        task.priority = None if i % 3 == 0 else i % 2  # NULLs and ties
+    db.session.commit()
+
+    for sort_by in ["id", "priority", "created_at", "description"]:
+        for sort_order in ["asc", "desc"]:
+            query = f"sort_by={sort_by}&sort_order={sort_order}"
+            expected = auth_client.get(f"/tasks?{query}&per_page=100").get_json()
+            walked = _walk_cursor(auth_client, query)
+            assert [i["id"] for i in walked] == [i["id"] for i in expected["items"]]
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_pagination_places_null_priorities_lowest(
+    auth_client, add_tasks, sort_order
+):
+    from app import db
+
+    tasks = add_tasks(6)
+    for task, priority in zip(tasks, [2, None, 1, None, 2, 1]):
+        task.priority = priority
+    db.session.commit()
+
+    walked = _walk_cursor(auth_client, f"sort_by=priority&sort_order={sort_order}")
+    ascending = [2, 4, 3, 6, 1, 5]  # NULLs, then 1s, then 2s; ties by id
+    expected = ascending if sort_order == "asc" else ascending[::-1]
+    assert [item["id"] for item in walked] == expected
+
+
+@pytest.mark.parametrize(
+    "sort_order, placement", [("asc", "NULLS FIRST"), ("desc", "NULLS LAST")]
+)
+def test_null_placement_is_explicit_on_postgres(app, sort_order, placement):
+    from sqlalchemy.dialects import postgresql
+
+    from app.pagination import listing_query
+
+    query = listing_query(1, None, "priority", sort_order)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert f"tasks.priority {sort_order.upper()} {placement}" in sql
+
+
+def test_cursor_from_other_sort_is_rejected(auth_client, add_tasks):
+    add_tasks(5)
+    res = auth_client.get("/tasks?cursor=&per_page=2&sort_by=id")
+    cursor = res.get_json()["meta"]["next_cursor"]
+
+    res = auth_client.get(f"/tasks?cursor={cursor}&per_page=2&sort_by=priority")
+    assert res.status_code == 400
+    assert "cursor" in res.get_json()["error"]["details"]
+
+    res = auth_client.get("/tasks?cursor=not-a-cursor")
+    assert res.status_code == 400
+
+
+def test_pagination_without_total(auth_client, add_tasks):
+    add_tasks(15)
+    res = auth_client.get("/tasks?page=1&per_page=10&include_total=false")
+    assert res.status_code == 200
+    data = res.get_json()
+    assert "total" not in data["meta"]
+    assert data["meta"]["has_next"] is True
+    assert len(data["items"]) == 10
+
+    res = auth_client.get("/tasks?cursor=&include_total=false")
+    assert "total" not in res.get_json()["meta"]
+
+
+# bulk endpoints
+
+
+def test_bulk_create_tasks(auth_client):
+    payload = [{"description": f"bulk task {i}", "priority": i} for i in range(5)]
+    res = auth_client.post("/tasks/bulk", json=payload)
+    assert res.status_code == 201
+    items = res.get_json()["items"]
+    assert [item["description"] for item in items] == [
+        f"Bulk task {i}" for i in range(5)
+    ]
+    assert all(item["user_id"] == 1 and item["completed"] is False for item in items)
+
+    res = auth_client.get("/tasks")
+    assert res.get_json()["meta"]["total"] == 5
+
+
+def test_bulk_create_rejects_whole_batch_on_invalid_item(auth_client):
+    payload = [{"description": "fine task"}, {"description": "shrek task"}]
+    res = auth_client.post("/tasks/bulk", json=payload)
+    assert res.status_code == 400
+    assert "1" in res.get_json()["error"]["details"]
+
+    res = auth_client.get("/tasks")
+    assert res.get_json()["meta"]["total"] == 0
+
+    res = auth_client.post("/tasks/bulk", json={"description": "not a list"})
+    assert res.status_code == 400
+
+
+def test_bulk_update_tasks(auth_client, add_tasks, add_task):
+    tasks = add_tasks(3)
+    other = add_task(description="Not mine", user_id=2)
+    payload = [
+        {"id": tasks[0].id, "priority": 5},
+        {"id": tasks[1].id, "priority": 5},
+        {"id": tasks[2].id, "description": "renamed task"},
+        {"id": other.id, "priority": 1},
+    ]
+    res = auth_client.patch("/tasks/bulk", json=payload)
+    assert res.status_code == 200
+    items = res.get_json()["items"]
+    assert [item["status"] for item in items] == [200, 200, 200, 404]
+    assert items[0]["task"]["priority"] == 5
+    assert items[1]["task"]["priority"] == 5
+    assert items[2]["task"]["description"] == "Renamed task"
+    assert items[2]["task"]["priority"] is None
+
+    res = auth_client.get(f"/tasks/{other.id}")
+    assert res.status_code == 404
+
+
+def test_bulk_update_rejects_duplicate_ids(auth_client, add_tasks):
+    tasks = add_tasks(2)
+    payload = [
+        {"id": tasks[0].id, "priority": 1},
+        {"id": tasks[1].id, "priority": 2},
+        {"id": tasks[0].id, "priority": 3},
+    ]
+    res = auth_client.patch("/tasks/bulk", json=payload)
+    assert res.status_code == 400
+    assert str(tasks[0].id) in res.get_json()["error"]["message"]
+
+    res = auth_client.get(f"/tasks/{tasks[0].id}")
+    assert res.get_json()["priority"] is None
+
+
+def test_bulk_delete_tasks(auth_client, add_tasks, add_task):
+    tasks = add_tasks(3)
+    other = add_task(description="Not mine", user_id=2)
+    ids = [tasks[0].id, tasks[2].id, other.id]
+    res = auth_client.delete("/tasks/bulk", json={"ids": ids})
+    assert res.status_code == 200
+    assert [item["status"] for item in res.get_json()["items"]] == [204, 204, 404]
+
+    res = auth_client.get("/tasks")
+    assert [item["id"] for item in res.get_json()["items"]] == [tasks[1].id]
+
+
+# conditional requests (ETag)
+
+
+def test_get_task_not_modified(auth_client, add_task):
+    task = add_task(description="Cached task")
+    res = auth_client.get(f"/tasks/{task.id}")
+    etag = res.headers["ETag"]
+    assert etag and not etag.startswith("W/")
+
+    res = auth_client.get(f"/tasks/{task.id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.headers["ETag"] == etag
+
+    auth_client.put(f"/tasks/{task.id}", json={"priority": 3})
+    res = auth_client.get(f"/tasks/{task.id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
+def test_list_tasks_not_modified(auth_client, add_tasks):
+    add_tasks(3)
+    res = auth_client.get("/tasks?per_page=2")
+    etag = res.headers["ETag"]
+
+    res = auth_client.get("/tasks?per_page=2", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    # other filters are a different representation
+    res = auth_client.get("/tasks?per_page=3", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+
+    auth_client.post("/tasks", json={"description": "Another task"})
+    res = auth_client.get("/tasks?per_page=2", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+
+
+def test_list_etag_moves_with_writes_in_the_same_instant(auth_client):
+    from app import db
+
+    created = auth_client.post("/tasks", json={"description": "Edited twice"})
+    task_id = created.get_json()["id"]
+    etag = auth_client.get("/tasks").headers["ETag"]
+    stamp = db.session.scalar(db.text("SELECT updated_at FROM task_summaries"))
+
+    # a second client's edit lands in the same millisecond: count and
+    # summary timestamp are both unchanged
+    auth_client.put(f"/tasks/{task_id}", json={"priority": 2})
+    db.session.execute(
+        db.text("UPDATE task_summaries SET updated_at = :stamp"), {"stamp": stamp}
+    )
+    db.session.commit()
+
+    res = auth_client.get("/tasks", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["items"][0]["priority"] == 2
+
+
+def test_update_task_if_match(auth_client, add_task):
+    task = add_task(description="Contended task")
+    etag = auth_client.get(f"/tasks/{task.id}").headers["ETag"]
+
+    res = auth_client.put(
+        f"/tasks/{task.id}", json={"priority": 1}, headers={"If-Match": etag}
+    )
+    assert res.status_code == 200
+
+    # a second writer holding the old version loses
+    res = auth_client.put(
+        f"/tasks/{task.id}", json={"priority": 2}, headers={"If-Match": etag}
+    )
+    assert res.status_code == 412
+    res = auth_client.delete(f"/tasks/{task.id}", headers={"If-Match": etag})
+    assert res.status_code == 412
+
+    res = auth_client.delete(f"/tasks/{task.id}", headers={"If-Match": "*"})
+    assert res.status_code == 204
+
+
+# projection (fields=)
+
+
+def test_list_tasks_with_fields(auth_client, add_tasks):
+    add_tasks(3)
+    res = auth_client.get("/tasks?fields=description,completed")
+    assert res.status_code == 200
+    items = res.get_json()["items"]
+    assert len(items) == 3
+    assert set(items[0]) == {"id", "description", "completed", "links"}
+    assert items[0]["links"]["self"] == f"/tasks/{items[0]['id']}"
+
+
+def test_list_tasks_with_fields_matches_full_listing(app, auth_client, add_tasks):
+    add_tasks(5)
+    full = auth_client.get("/tasks?sort_by=description&sort_order=desc").get_json()
+    for fast in (True, False):
+        app.config["TASK_FAST_SERIALIZER"] = fast
+        res = auth_client.get(
+            "/tasks?sort_by=description&sort_order=desc&fields=description,priority"
+        )
+        projected = res.get_json()
+        assert projected["meta"] == full["meta"]
+        assert [(i["id"], i["description"], i["priority"]) for i in full["items"]] == [
+            (i["id"], i["description"], i["priority"]) for i in projected["items"]
+        ]
+
+
+def test_list_tasks_with_fields_and_cursor(auth_client, add_tasks):
+    add_tasks(5)
+    query = "/tasks?fields=completed&sort_by=description&per_page=3"
+    res = auth_client.get(f"{query}&cursor=")
+    data = res.get_json()
+    assert "description" not in data["items"][0]
+    res = auth_client.get(f"{query}&cursor={data['meta']['next_cursor']}")
+    assert [item["id"] for item in res.get_json()["items"]] == [4, 5]
+
+
+def test_list_tasks_with_unknown_field(auth_client):
+    res = auth_client.get("/tasks?fields=description,password_hash")
+    assert res.status_code == 400
+    assert "fields" in res.get_json()["error"]["details"]
+
+
+# per-user summary
+
+
+def test_task_stats(auth_client):
+    res = auth_client.get("/tasks/stats")
+    assert res.status_code == 200
+    assert res.get_json()["total"] == 0
+
+    ids = [
+        auth_client.post("/tasks", json={"description": f"Task {i}"}).get_json()["id"]
+        for i in range(4)
+    ]
+    auth_client.post(f"/tasks/{ids[0]}/complete")
+    auth_client.post(f"/tasks/{ids[0]}/complete")  # already complete: no change
+    auth_client.put(
+        f"/tasks/{ids[1]}", json={"description": "Done", "completed": True}
+    )
+    auth_client.delete(f"/tasks/{ids[2]}")
+    auth_client.post("/tasks/bulk", json=[{"description": "bulk one"}])
+    auth_client.patch(
+        "/tasks/bulk",
+        json=[{"id": ids[3], "description": "Done too", "completed": True}],
+    )
+
+    data = auth_client.get("/tasks/stats").get_json()
+    assert (data["total"], data["completed"], data["open"]) == (4, 3, 1)
+    assert "updated_at" in data
+
+    res = auth_client.get("/tasks?completed=true")
+    assert res.get_json()["meta"]["total"] == 3
+
+
+def test_listing_total_comes_from_summary(auth_client, add_tasks):
+    from app import db
+    from app.models import TaskSummary
+
+    for i in range(3):
+        auth_client.post("/tasks", json={"description": f"Task {i}"})
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 3
+
+    # writes that bypass the API are not counted until a repair
+    add_tasks(2)
+    assert auth_client.get("/tasks").get_json()["meta"]["total"] == 3
+    assert db.session.get(TaskSummary, 1).total == 3
+
+
+def test_reads_never_write_a_missing_summary(auth_client, add_tasks):
+    from app import db
+    from app.models import TaskSummary
+
+    add_tasks(3)  # no summary row yet
+    res = auth_client.get("/tasks")
+    assert res.get_json()["meta"]["total"] == 3
+    assert auth_client.get("/tasks/stats").get_json()["total"] == 3
+    assert db.session.get(TaskSummary, 1) is None
+
+    # the next write creates it, stamped by the database
+    auth_client.post("/tasks", json={"description": "Fourth task"})
+    summary = db.session.get(TaskSummary, 1)
+    assert summary.total == 4
+    assert summary.updated_at is not None
+    assert auth_client.get("/tasks").headers["ETag"] != res.headers["ETag"]
+
+
+def test_repair_task_summaries_command(app, auth_client, add_tasks):
+    auth_client.post("/tasks", json={"description": "Counted task"})
+    add_tasks(2)  # bypasses the summary
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["repair-task-summaries"])
+    assert "Repaired 1 task summaries" in result.output
+    assert auth_client.get("/tasks/stats").get_json()["total"] == 3
+
+
+# full-text search
+
+
+def test_search_tasks(auth_client):
+    for description in [
+        "Buy milk and bread",
+        "Paint the fence",
+        "Buy paint brushes",
+        "Call the bank",
+    ]:
+        auth_client.post("/tasks", json={"description": description})
+
+    res = auth_client.get("/tasks?q=buy")
+    assert res.status_code == 200
+    data = res.get_json()
+    assert "total" not in data["meta"]  # counted only on request
+    assert data["meta"]["has_next"] is False
+    res = auth_client.get("/tasks?q=buy&include_total=true")
+    data = res.get_json()
+    assert data["meta"]["total"] == 2
+    assert {item["description"] for item in data["items"]} == {
+        "Buy milk and bread",
+        "Buy paint brushes",
+    }
+
+    # stemmed prefix match, every word required
+    res = auth_client.get("/tasks?q=paint brush")
+    assert [item["description"] for item in res.get_json()["items"]] == [
+        "Buy paint brushes"
+    ]
+
+    res = auth_client.get("/tasks?q=nothing matches")
+    assert res.get_json()["items"] == []
+
+
+def test_search_matches_word_prefixes_on_every_backend(auth_client):
+    from app.search import pg_tsquery
+
+    auth_client.post("/tasks", json={"description": "Budget review"})
+    auth_client.post("/tasks", json={"description": "Buddy call"})
+    auth_client.post("/tasks", json={"description": "Plan the budget"})
+
+    items = auth_client.get("/tasks?q=budg").get_json()["items"]
+    assert sorted(item["description"] for item in items) == [
+        "Budget review",
+        "Plan the budget",
+    ]
+    items = auth_client.get("/tasks?q=bud pla").get_json()["items"]
+    assert [item["description"] for item in items] == ["Plan the budget"]
+    assert auth_client.get("/tasks?q=!&").get_json()["items"] == []
+    assert pg_tsquery("bud, pla!") == "bud:* & pla:*"
+
+
+def test_search_follows_updates_and_deletes(auth_client):
+    res = auth_client.post("/tasks", json={"description": "Walk dog"})
+    task_id = res.get_json()["id"]
+    auth_client.put(f"/tasks/{task_id}", json={"description": "Walk cat"})
+    assert auth_client.get("/tasks?q=dog").get_json()["items"] == []
+    assert len(auth_client.get("/tasks?q=cat").get_json()["items"]) == 1
+
+    auth_client.delete(f"/tasks/{task_id}")
+    assert auth_client.get("/tasks?q=cat").get_json()["items"] == []
+
+
+def test_search_combines_with_filters_and_paging(auth_client, add_task):
+    for i in range(5):
+        auth_client.post("/tasks", json={"description": f"Report part {i}"})
+    auth_client.post("/tasks/1/complete")
+    add_task(description="Report for someone else", user_id=2)
+
+    res = auth_client.get(
+        "/tasks?q=report&completed=false&per_page=2&page=2&include_total=true"
+    )
+    data = res.get_json()
+    assert data["meta"]["total"] == 4
+    assert len(data["items"]) == 2
+    assert all(item["user_id"] == 1 for item in data["items"])
+
+    res = auth_client.get("/tasks?q=report&sort_by=id&cursor=&per_page=10")
+    assert len(res.get_json()["items"]) == 5
+
+
+def test_search_index_is_scoped_to_the_owner(app, auth_client, add_task):
+    from app import db
+    from app.search import fts_query
+
+    auth_client.post("/tasks", json={"description": "Report for me"})
+    for user_id in (2, 11):  # 11 must not match a search by user 1
+        add_task(description="Report for someone else", user_id=user_id)
+
+    if db.engine.dialect.name == "sqlite":
+        # the MATCH itself only finds user 1's row, before any user_id filter
+        matched = db.session.scalars(
+            db.text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :q"),
+            {"q": fts_query("report", 1)},
+        ).all()
+        assert matched == [1]
+
+    # a task moved to another user leaves the old owner's results
+    db.session.execute(db.text("UPDATE tasks SET user_id = 2 WHERE id = 1"))
+    db.session.commit()
+    assert auth_client.get("/tasks?q=report").get_json()["items"] == []
+
+
+def test_create_all_builds_the_postgres_search_column(app):
+    from app import db
+
+    if db.engine.dialect.name != "postgresql":
+        pytest.skip("PostgreSQL only: run with TEST_DATABASE_URL")
+    inspector = db.inspect(db.engine)
+    assert "search_vector" in {c["name"] for c in inspector.get_columns("tasks")}
+    indexes = {index["name"] for index in inspector.get_indexes("tasks")}
+    assert "ix_tasks_search_vector" in indexes
+
+
+def test_search_ranks_best_match_first(auth_client):
+    auth_client.post("/tasks", json={"description": "Garden tools and garden seeds"})
+    auth_client.post("/tasks", json={"description": "Fix garage door"})
+    auth_client.post("/tasks", json={"description": "Water the garden"})
+
+    items = auth_client.get("/tasks?q=garden").get_json()["items"]
+    assert items[0]["description"] == "Garden tools and garden seeds"
+
+    res = auth_client.get("/tasks?sort_by=rank")
+    assert res.status_code == 400
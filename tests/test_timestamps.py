@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Task
+
+
+def test_timestamps_are_stamped_per_row(app, auth_client):
+    first = auth_client.post("/tasks", json={"description": "First task"}).get_json()
+    second = auth_client.post("/tasks", json={"description": "Second task"}).get_json()
+    assert first["created_at"] < second["created_at"]
+    assert first["updated_at"] >= first["created_at"]
+
+
+def test_updates_move_updated_at_only(auth_client):
+    created = auth_client.post("/tasks", json={"description": "Moving task"}).get_json()
+    updated = auth_client.put(f"/tasks/{created['id']}", json={"priority": 1})
+    updated = updated.get_json()
+    assert updated["created_at"] == created["created_at"]
+    assert updated["updated_at"] > created["updated_at"]
+
+    completed = auth_client.post(f"/tasks/{created['id']}/complete").get_json()
+    assert completed["updated_at"] > updated["updated_at"]
+
+
+def test_bulk_updates_move_updated_at(auth_client, add_tasks):
+    before = {task.id: task.updated_at for task in add_tasks(2)}
+    res = auth_client.patch("/tasks/bulk", json=[{"id": 1, "priority": 4}])
+    assert res.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Task, 1).updated_at > before[1]
+    assert db.session.get(Task, 2).updated_at == before[2]
+
+
+def test_plain_sql_writes_get_server_side_timestamps(app, add_task):
+    add_task()
+    db.session.execute(
+        db.text(
+            "INSERT INTO tasks (description, completed, user_id) VALUES ('Raw', 0, 1)"
+        )
+    )
+    raw = db.session.scalars(db.select(Task).filter_by(description="Raw")).one()
+    assert raw.created_at is not None and raw.updated_at is not None
+
+    before = db.session.get(Task, 1).updated_at
+    db.session.execute(db.text("UPDATE tasks SET priority = 9 WHERE id = 1"))
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(Task, 1).updated_at > before
+
+
+def test_every_writer_uses_one_timestamp_format(app, auth_client):
+    # SQLite compares the stored text: a stamp without the fraction would
+    # sort before app stamps of the same second
+    auth_client.post("/tasks", json={"description": "App task"})
+    db.session.execute(
+        db.text(
+            "INSERT INTO tasks (description, completed, user_id) VALUES ('Raw', 0, 1)"
+        )
+    )
+    db.session.execute(db.text("UPDATE tasks SET priority = 2 WHERE id = 1"))
+    rows = db.session.execute(
+        db.text("SELECT created_at, updated_at FROM tasks ORDER BY id")
+    ).all()
+    stamps = [value for row in rows for value in row]
+    if db.engine.dialect.name == "sqlite":
+        assert all(len(value) == 26 for value in stamps), stamps
+
+    order = db.session.scalars(
+        db.text("SELECT id FROM tasks ORDER BY created_at, id")
+    ).all()
+    assert order == [1, 2]
+
+    if db.engine.dialect.name == "postgresql":
+        # a server off UTC: app stamps must still agree with timezone('utc',
+        # now()) rather than move by the session's offset
+        with db.engine.connect() as conn:
+            conn.execute(db.text("SET TIME ZONE 'Asia/Tokyo'"))
+            with Session(bind=conn) as session:
+                session.add(Task(description="App zoned", user_id=1))
+                session.flush()
+                conn.execute(
+                    db.text(
+                        "INSERT INTO tasks (description, completed, user_id) "
+                        "VALUES ('Raw zoned', false, 1)"
+                    )
+                )
+                app_stamp, raw_stamp = conn.execute(
+                    db.text(
+                        "SELECT created_at FROM tasks WHERE description IN "
+                        "('App zoned', 'Raw zoned') ORDER BY id"
+                    )
+                ).scalars()
+            conn.rollback()
+        assert abs(raw_stamp - app_stamp) < timedelta(minutes=1)
@@ -0,0 +1,123 @@
+import time
+from datetime import timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.config import TestConfig
+from app.models import User
+from app.tokens import ClaimsCache, RevocationList, SharedRevocationList
+
+
+def test_repeat_requests_reuse_verified_claims(app, auth_client):
+    cache = app.extensions["jwt_claims_cache"]
+    auth_client.get("/tasks")
+    auth_client.get("/tasks")
+    auth_client.get("/me")
+    assert cache.misses == 1
+    assert cache.hits == 2
+
+
+def test_claims_cache_never_outlives_the_token():
+    cache = ClaimsCache(ttl=300)
+    cache.set("token", {"sub": "1", "exp": time.time() - 1})
+    assert cache.get("token") is None
+
+    cache.set("token", {"sub": "1", "exp": time.time() + 60})
+    assert cache.get("token")["sub"] == "1"
+
+
+def test_claims_cache_is_bounded():
+    cache = ClaimsCache(max_entries=2)
+    for token in ("a", "b", "c"):
+        cache.set(token, {"sub": token})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"sub": "c"}
+
+
+def test_tampered_token_is_rejected_after_caching(auth_client, client):
+    assert auth_client.get("/tasks").status_code == 200
+    header, payload, signature = auth_client.token.split(".")
+    forged = f"{header}.{payload}.{signature[:-2]}AA"
+    res = client.get("/tasks", headers={"Authorization": f"Bearer {forged}"})
+    assert res.status_code == 422
+
+
+def test_expired_token_is_rejected(app, client, auth_client):
+    with app.app_context():
+        token = create_access_token("1", expires_delta=timedelta(seconds=-1))
+    res = client.get("/tasks", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 401
+
+
+def test_logout_revokes_the_token(auth_client, client):
+    assert auth_client.get("/me").status_code == 200
+    res = auth_client.post("/logout")
+    assert res.status_code == 200
+
+    res = auth_client.get("/tasks")
+    assert res.status_code == 401
+    assert "revoked" in res.get_json()["msg"]
+
+    # a fresh login still works
+    res = client.post(
+        "/login", json={"username": "testuser", "password": "password123"}
+    )
+    token = res.get_json()["access_token"]
+    res = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+
+
+def test_me_reads_the_current_user_not_the_token(auth_client):
+    res = auth_client.get("/me")
+    assert res.get_json() == {"id": 1, "username": "testuser", "role": "user"}
+
+    user = db.session.get(User, 1)
+    user.username, user.role = "renamed", "manager"
+    db.session.commit()
+    res = auth_client.get("/me")
+    assert res.get_json() == {"id": 1, "username": "renamed", "role": "manager"}
+
+    db.session.delete(user)
+    db.session.commit()
+    assert auth_client.get("/me").status_code == 404
+
+
+@pytest.mark.parametrize("backend", ["memory", "shared"])
+def test_revocation_list_backends(backend, fake_shared_client):
+    if backend == "memory":
+        revoked = RevocationList()
+    else:
+        revoked = SharedRevocationList(fake_shared_client)
+    revoked.revoke("abc", time.time() + 60)
+    assert revoked.is_revoked("abc")
+    assert not revoked.is_revoked("def")
+
+
+def test_expired_revocations_are_dropped():
+    revoked = RevocationList()
+    revoked.revoke("abc", time.time() - 1)
+    assert not revoked.is_revoked("abc")
+    revoked.revoke("forever", None)
+    assert revoked.is_revoked("forever")
+
+
+def test_shared_revocations_are_seen_by_other_workers(fake_shared_client):
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": TestConfig.SQLALCHEMY_DATABASE_URI,
+        "PASSWORD_HASH_METHOD": TestConfig.PASSWORD_HASH_METHOD,
+        "JWT_REVOCATION": "shared",
+        "JWT_REVOCATION_CLIENT": fake_shared_client,
+    }
+    worker_a, worker_b = create_app(config), create_app(config)
+    with worker_a.app_context():
+        token = create_access_token("1", additional_claims={"role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    # a route that needs no tables: these apps have none
+    url = "/admin/dashboard"
+
+    assert worker_b.test_client().get(url, headers=headers).status_code == 200
+    assert worker_a.test_client().post("/logout", headers=headers).status_code == 200
+    assert worker_b.test_client().get(url, headers=headers).status_code == 401
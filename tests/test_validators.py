@@ -0,0 +1,45 @@
+import pytest
+
+from app.schemas import TaskSchema
+from app.validators import forbidden_words_pattern
+
+
+def _errors(description):
+    return TaskSchema().validate({"description": description}).get("description")
+
+
+@pytest.mark.parametrize(
+    "description, expected",
+    [
+        ("Water the plants", None),
+        ("No", ["Length must be between 3 and 120."]),
+        ("x" * 121, ["Length must be between 3 and 120."]),
+        ("Hi!", ["No special characters allowed"]),
+        ("!", ["Length must be between 3 and 120.", "No special characters allowed"]),
+        ("Call SHREK today", ["Task description can not contain: shrek"]),
+        ("Adummyword", ["Task description can not contain: dummy"]),
+    ],
+)
+def test_description_rules(app, description, expected):
+    assert _errors(description) == expected
+
+
+def test_forbidden_words_pattern():
+    pattern = forbidden_words_pattern(["cat", "category", "dog", "do", " ", "C.T"])
+    assert pattern.search("a dog").group(0) == "do"
+    assert pattern.search("concatenate").group(0) == "cat"
+    assert pattern.search("c t") is None  # terms are literal, not regexes
+    assert pattern.search("c.t").group(0) == "c.t"
+    assert forbidden_words_pattern(["", "  "]) is None
+
+
+def test_forbidden_words_follow_the_config(app, auth_client):
+    app.config["FORBIDDEN_WORDS"] = [f"term{i}" for i in range(5000)] + ["gerbil"]
+    res = auth_client.post("/tasks", json={"description": "Feed the gerbil"})
+    assert res.status_code == 400
+    res = auth_client.post("/tasks", json={"description": "Ask shrek"})
+    assert res.status_code == 201  # the built-in list no longer applies
+
+    app.config["FORBIDDEN_WORDS"] = []
+    res = auth_client.post("/tasks", json={"description": "Feed the gerbil"})
+    assert res.status_code == 201
@@ -0,0 +1,221 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import db
+from app.models import TaskEvent, WebhookCursor, utcnow
+from app.webhooks import WebhookDispatcher, configured_endpoints, sign
+
+SECRET = "webhook-secret"
+
+
+class Receiver:
+    """Local HTTP stand-in for a webhook consumer."""
+
+    def __init__(self):
+        self.requests = []
+        self.fail_next = 0
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if receiver.fail_next:
+                    receiver.fail_next -= 1
+                    self.send_response(503)
+                else:
+                    receiver.requests.append((dict(self.headers), body))
+                    self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hooks"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events(self):
+        return [
+            event
+            for _, body in self.requests
+            for event in json.loads(body)["events"]
+        ]
+
+
+@pytest.fixture
+def receiver(app):
+    receiver = Receiver()
+    app.config["WEBHOOK_ENDPOINTS"] = [{"url": receiver.url, "secret": SECRET}]
+    yield receiver
+    receiver.server.shutdown()
+
+
+@pytest.fixture
+def dispatcher(app, receiver):
+    dispatcher = WebhookDispatcher(
+        app, configured_endpoints(app.config), backoff_base=0.0, safety_window_ms=0
+    )
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_task_writes_record_events_in_the_same_commit(receiver, auth_client):
+    res = auth_client.post("/tasks", json={"description": "Outbox task"})
+    task_id = res.get_json()["id"]
+    auth_client.put(f"/tasks/{task_id}", json={"priority": 2})
+    auth_client.post(f"/tasks/{task_id}/complete")
+    auth_client.delete(f"/tasks/{task_id}")
+    # a rejected write leaves nothing behind
+    auth_client.post("/tasks", json={"description": "x"})
+
+    events = db.session.scalars(db.select(TaskEvent).order_by(TaskEvent.id)).all()
+    assert [event.event_type for event in events] == [
+        "task.created",
+        "task.updated",
+        "task.completed",
+        "task.deleted",
+    ]
+    assert events[1].payload["priority"] == 2
+    assert events[3].payload == {"id": task_id, "user_id": 1}
+
+
+def test_bulk_writes_record_one_event_per_task(receiver, auth_client):
+    created = auth_client.post(
+        "/tasks/bulk", json=[{"description": "First task"}, {"description": "Second"}]
+    ).get_json()["items"]
+    ids = [task["id"] for task in created]
+    res = auth_client.patch(
+        "/tasks/bulk", json=[{"id": ids[0], "priority": 3}, {"id": 999}]
+    )
+    assert res.get_json()["items"][0]["task"]["priority"] == 3
+    auth_client.delete("/tasks/bulk", json={"ids": ids})
+
+    types = db.session.scalars(
+        db.select(TaskEvent.event_type).order_by(TaskEvent.id)
+    ).all()
+    assert types == ["task.created"] * 2 + ["task.updated"] + ["task.deleted"] * 2
+
+
+def test_writes_that_change_nothing_record_nothing(receiver, auth_client):
+    from app.models import TaskSummary
+
+    res = auth_client.post("/tasks", json={"description": "Done once", "priority": 2})
+    task_id = res.get_json()["id"]
+    auth_client.post(f"/tasks/{task_id}/complete")
+
+    def outbox():
+        return db.session.scalar(db.select(db.func.count(TaskEvent.id)))
+
+    before = outbox(), db.session.get(TaskSummary, 1).version
+    res = auth_client.post(f"/tasks/{task_id}/complete")
+    assert res.status_code == 200 and res.get_json()["completed"] is True
+    auth_client.put(f"/tasks/{task_id}", json={"priority": 2})
+    res = auth_client.patch(
+        "/tasks/bulk", json=[{"id": task_id, "priority": 2, "description": "Done once"}]
+    )
+    assert res.get_json()["items"][0]["changed"] is False
+    db.session.expire_all()
+    assert (outbox(), db.session.get(TaskSummary, 1).version) == before
+
+    res = auth_client.patch("/tasks/bulk", json=[{"id": task_id, "priority": 4}])
+    assert res.get_json()["items"][0]["changed"] is True
+    assert outbox() == before[0] + 1
+
+
+def test_no_events_without_endpoints(app, auth_client):
+    assert app.config["WEBHOOK_ENDPOINTS"] == []
+    auth_client.post("/tasks", json={"description": "Quiet task"})
+    assert db.session.scalar(db.select(db.func.count(TaskEvent.id))) == 0
+
+
+def test_dispatcher_sends_signed_batches_in_order(
+    app, receiver, dispatcher, auth_client
+):
+    for i in range(3):
+        auth_client.post("/tasks", json={"description": f"Task {i}"})
+    dispatcher.batch_size = 2
+
+    assert dispatcher.run_once() == 2
+    assert dispatcher.run_once() == 1
+    assert dispatcher.run_once() == 0
+
+    assert len(receiver.requests) == 2
+    for headers, body in receiver.requests:
+        timestamp = headers["X-Webhook-Timestamp"]
+        assert headers["X-Webhook-Signature"] == sign(SECRET, timestamp, body)
+    events = receiver.events()
+    assert [event["data"]["description"] for event in events] == [
+        "Task 0",
+        "Task 1",
+        "Task 2",
+    ]
+    assert [event["id"] for event in events] == sorted(event["id"] for event in events)
+
+    # delivered everywhere, so the outbox has been emptied
+    db.session.expire_all()
+    assert db.session.scalar(db.select(db.func.count(TaskEvent.id))) == 0
+    assert db.session.get(WebhookCursor, receiver.url).last_event_id == events[-1]["id"]
+
+
+def test_failed_delivery_is_retried(app, receiver, dispatcher, auth_client):
+    auth_client.post("/tasks", json={"description": "Retry me"})
+    receiver.fail_next = 2
+
+    assert dispatcher.run_once() == 0
+    assert dispatcher.run_once() == 0
+    assert dispatcher._failures[receiver.url] == 2
+    assert dispatcher.run_once() == 1
+    assert receiver.events()[0]["data"]["description"] == "Retry me"
+    assert receiver.url not in dispatcher._failures
+
+
+def test_backoff_holds_back_a_failing_endpoint(app, receiver, auth_client):
+    dispatcher = WebhookDispatcher(
+        app, configured_endpoints(app.config), backoff_base=60.0, safety_window_ms=0
+    )
+    auth_client.post("/tasks", json={"description": "Later"})
+    receiver.fail_next = 1
+    try:
+        assert dispatcher.run_once() == 0
+        assert dispatcher.run_once() == 0  # not due yet: no second request
+        assert receiver.fail_next == 0 and receiver.requests == []
+    finally:
+        dispatcher.shutdown()
+
+
+def test_events_inside_the_safety_window_wait(app, receiver, dispatcher, auth_client):
+    for i in range(2):
+        auth_client.post("/tasks", json={"description": f"Task {i}"})
+    first, second = db.session.scalars(
+        db.select(TaskEvent).order_by(TaskEvent.id)
+    ).all()
+    ids = [first.id, second.id]
+    # the lower id was written last, as by a transaction still committing
+    old = utcnow() - timedelta(seconds=5)
+    second.created_at = old
+    db.session.commit()
+    dispatcher.safety_window = timedelta(seconds=1)
+
+    assert dispatcher.run_once() == 0
+    assert receiver.requests == []
+
+    first.created_at = old
+    db.session.commit()
+    assert dispatcher.run_once() == 2
+    assert [event["id"] for event in receiver.events()] == ids
+
+
+def test_outbox_is_pruned_on_idle_passes(app, receiver, dispatcher, auth_client):
+    auth_client.post("/tasks", json={"description": "Sent elsewhere"})
+    last_id = db.session.scalar(db.select(db.func.max(TaskEvent.id)))
+    # another dispatcher process delivered it but hasn't pruned yet
+    db.session.add(WebhookCursor(endpoint=receiver.url, last_event_id=last_id))
+    db.session.commit()
+
+    assert dispatcher.run_once() == 0
+    db.session.expire_all()
+    assert db.session.scalar(db.select(db.func.count(TaskEvent.id))) == 0